@@ -4,28 +4,62 @@ Geography Games Collection
 Main menu to access different games
 """
 
-from flask import Flask, render_template, send_from_directory, jsonify
+from flask import Flask, Response, render_template, send_from_directory, jsonify, request, stream_with_context
 from pathlib import Path
+import hmac
+import json
 import os
+import random
+
+from common import history, logs, reload
+from common.assets import asset_store
+from common.cache import cached, response_cache
+from common.ratelimit import client_limiter, score_limiter
+
+# JSON log lines written by a background thread (LOG_LEVEL, LOG_LEVELS)
+logs.setup()
 
 app = Flask(__name__)
+logs.init_app(app)
 
 # Import and register game blueprints
-from flag_game.game import flag_game_bp
-from toulouse_game.game import toulouse_game_bp
-from top14_quiz.game import top14_quiz_bp
-from pi_game.game import pi_game_bp
+from flag_game.game import flag_game_bp, build_question as build_flag_question, rooms as flag_rooms
+from flag_game.duel import flag_duel_bp
+from toulouse_game import game as toulouse_game
+from toulouse_game.game import toulouse_game_bp, build_question as build_toulouse_question
+from top14_quiz.game import top14_quiz_bp, build_question as build_top14_question, seasons as top14_seasons
+from pi_game.game import pi_game_bp, build_question as build_pi_question, PI_DECIMALS, rooms as pi_rooms
 
 app.register_blueprint(pi_game_bp, url_prefix='/pi-game')
 app.register_blueprint(flag_game_bp, url_prefix='/flag-game')
+app.register_blueprint(flag_duel_bp, url_prefix='/flag-game/duel')
 app.register_blueprint(toulouse_game_bp, url_prefix='/toulouse-game')
 app.register_blueprint(top14_quiz_bp, url_prefix='/top14-quiz')
 
+# Reload datasets when their files change (squad photos, stats...)
+if os.environ.get('HOT_RELOAD') == '1':
+    reload.watch()
+
 # Chemin vers les images de résultats
 RESULTS_FOLDER = Path(__file__).parent / "static" / "results"
 
+# Small images served from memory when ASSET_STORE_MB is set
+asset_store.load_folder('results', RESULTS_FOLDER)
+
+# Question builders for the bulk export, called as builder(rng, index)
+QUESTION_BUILDERS = {
+    'flag': lambda rng, i: build_flag_question(rng=rng),
+    'toulouse': lambda rng, i: build_toulouse_question(rng),
+    'top14': lambda rng, i: build_top14_question(rng),
+    'pi': lambda rng, i: build_pi_question(i % len(PI_DECIMALS), rng),
+}
+
+MAX_STREAM_QUESTIONS = 10_000_000
+STREAM_BATCH = 256  # lines per chunk written to the socket
+
 
 @app.route('/')
+@cached('static')
 def index():
     """Single page application."""
     return render_template('index.html')
@@ -33,11 +67,12 @@ def index():
 
 @app.route('/static/results/<path:filename>')
 def serve_result_image(filename):
-    """Serve result images."""
-    return send_from_directory(RESULTS_FOLDER, filename)
+    """Serve result images (from memory when the asset store is enabled)."""
+    return asset_store.response('results', filename) or send_from_directory(RESULTS_FOLDER, filename)
 
 
 @app.route('/manifest.json')
+@cached('static')
 def manifest():
     """Serve PWA manifest."""
     return jsonify({
@@ -51,6 +86,129 @@ def manifest():
     })
 
 
+def question_lines(game, n, seed=None):
+    """Yield n questions as NDJSON, a batch of lines at a time.
+
+    With a seed, question i is the one /api/question?seed=&index=i returns;
+    without, one private RNG drives the whole stream. Lines keep the answer
+    in clear and carry no token: they are for offline play, where nothing
+    is verified. Nothing is kept between batches, so memory stays flat
+    whatever n is.
+    """
+    build = QUESTION_BUILDERS[game]
+    rng = random.Random()
+    batch = []
+
+    for i in range(n):
+        if seed is not None:
+            rng = random.Random(f"{game}:{seed}:{i}")
+        question = build(rng, i)
+        if question is None:
+            continue
+        del question['token']
+        batch.append(json.dumps(question, ensure_ascii=False))
+
+        if len(batch) >= STREAM_BATCH:
+            yield '\n'.join(batch) + '\n'
+            batch = []
+
+    if batch:
+        yield '\n'.join(batch) + '\n'
+
+
+@app.route('/api/questions/stream')
+def stream_questions():
+    """Stream n questions of a game as newline-delimited JSON (chunked)."""
+    game = request.args.get('game')
+    n = request.args.get('n', 100, type=int)
+    seed = request.args.get('seed')
+
+    if game not in QUESTION_BUILDERS:
+        return jsonify({'error': f"game must be one of {', '.join(QUESTION_BUILDERS)}"}), 400
+    if not 0 < n <= MAX_STREAM_QUESTIONS:
+        return jsonify({'error': f'n must be between 1 and {MAX_STREAM_QUESTIONS}'}), 400
+    if game == 'toulouse' and len(toulouse_game.snapshot.players) < 4:
+        return jsonify({'error': 'Not enough players loaded'}), 404
+    if game == 'top14' and top14_seasons.latest is None:
+        return jsonify({'error': 'No Top 14 season available'}), 404
+
+    return Response(stream_with_context(question_lines(game, n, seed)),
+                    mimetype='application/x-ndjson')
+
+
+@app.route('/api/history/games', methods=['POST'])
+def record_finished_game():
+    """Record a finished game ({game, name, score, time}) for games without a leaderboard."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('game'), str) or data['game'] not in QUESTION_BUILDERS:
+        return jsonify({'error': 'Missing or unknown game'}), 400
+
+    try:
+        score = float(data['score'])
+        duration = float(data['time']) if data.get('time') is not None else None
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'score (and time) must be numbers'}), 400
+
+    history.record_game(data['game'], score, data.get('name'), duration)
+    return jsonify({'success': True}), 202
+
+
+@app.route('/api/analytics/hardest')
+def analytics_hardest():
+    """Items with the lowest success rate (?game=flag|toulouse|top14|pi&limit=&min_attempts=)."""
+    game = request.args.get('game')
+    if game not in QUESTION_BUILDERS:
+        return jsonify({'error': f"game must be one of {', '.join(QUESTION_BUILDERS)}"}), 400
+
+    limit = max(1, min(request.args.get('limit', 10, type=int), 100))
+    min_attempts = max(1, min(request.args.get('min_attempts', 5, type=int), 1000))
+    return jsonify({'game': game, 'items': history.hardest_items(game, limit, min_attempts)})
+
+
+@app.route('/api/analytics/player')
+def analytics_player():
+    """A player's latest games and accuracy (?name=&game=)."""
+    name = request.args.get('name')
+    if not name:
+        return jsonify({'error': 'Missing name'}), 400
+    return jsonify(history.player_progress(name[:20], request.args.get('game')))
+
+
+def is_admin():
+    """True when the X-Admin-Token header matches the ADMIN_TOKEN environment variable."""
+    admin_token = os.environ.get('ADMIN_TOKEN')
+    return bool(admin_token) and hmac.compare_digest(request.headers.get('X-Admin-Token', ''), admin_token)
+
+
+@app.route('/admin/stats')
+def admin_stats():
+    """Counters of the response cache, the score limiter, Top 14 seasons and leaderboard rooms."""
+    if not is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+    return jsonify({'cache': response_cache.stats(), 'score_limiter': score_limiter.stats(),
+                    'client_limiter': client_limiter.stats(),
+                    'top14_seasons': top14_seasons.stats(), 'history': history.stats(),
+                    'rooms': {'flag': flag_rooms.stats(), 'pi': pi_rooms.stats()}})
+
+
+@app.route('/admin/reload', methods=['POST'])
+def admin_reload():
+    """Reload datasets in the background (?name=countries|players|top14, default all).
+
+    Needs an admin token (see is_admin).
+    """
+    if not is_admin():
+        return jsonify({'error': 'Forbidden'}), 403
+
+    names = request.args.getlist('name') or list(reload.loaders)
+    unknown = [name for name in names if name not in reload.loaders]
+    if unknown:
+        return jsonify({'error': f"Unknown dataset {', '.join(unknown)}"}), 400
+
+    reload.reload_in_background(names)
+    return jsonify({'reloading': names}), 202
+
+
 @app.route('/service-worker.js')
 def service_worker():
     """Serve service worker."""
@@ -0,0 +1,82 @@
+"""
+In-memory asset store
+Opt-in (ASSET_STORE_MB > 0): small images are read once at startup and
+served from memory with precomputed headers, without touching the disk.
+Files that don't fit the budget fall back to send_from_directory, which
+uses the server's sendfile support.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from typing import NamedTuple
+
+from flask import Response, request
+
+BUDGET = int(float(os.environ.get('ASSET_STORE_MB', 0)) * 1024 * 1024)
+CACHE_CONTROL = 'public, max-age=86400'
+
+
+class Asset(NamedTuple):
+    body: bytes
+    etag: str
+    headers: list
+
+
+class AssetStore:
+    """Files kept as bytes, keyed by '<prefix>/<relative path>', within a byte budget."""
+
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.assets = {}
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.budget > 0
+
+    def load_folder(self, prefix, folder):
+        """Load a folder's files, smallest first, until the budget is spent.
+
+        Reloading a prefix replaces its previous files. Returns how many
+        files are held.
+        """
+        if not self.enabled:
+            return 0
+
+        files = sorted((f for f in folder.rglob('*') if f.is_file()), key=lambda f: f.stat().st_size)
+        with self.lock:
+            for key in [k for k in self.assets if k.startswith(f"{prefix}/")]:
+                self.used -= len(self.assets.pop(key).body)
+
+            loaded = 0
+            for file in files:
+                size = file.stat().st_size
+                if self.used + size > self.budget:
+                    break
+                body = file.read_bytes()
+                etag = hashlib.sha1(body).hexdigest()
+                mimetype = mimetypes.guess_type(file.name)[0] or 'application/octet-stream'
+                self.assets[f"{prefix}/{file.relative_to(folder).as_posix()}"] = Asset(body, etag, [
+                    ('Content-Type', mimetype),
+                    ('Content-Length', str(len(body))),
+                    ('ETag', f'"{etag}"'),
+                    ('Cache-Control', CACHE_CONTROL),
+                ])
+                self.used += len(body)
+                loaded += 1
+        return loaded
+
+    def response(self, prefix, filename):
+        """Response for a stored file, or None if it is not in memory."""
+        asset = self.assets.get(f"{prefix}/{filename}")
+        if asset is None:
+            return None
+        if asset.etag in request.if_none_match:
+            return Response(status=304, headers=asset.headers[2:])
+        return Response(asset.body, headers=asset.headers, direct_passthrough=True)
+
+
+asset_store = AssetStore()
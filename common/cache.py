@@ -0,0 +1,119 @@
+"""
+In-process response cache
+Keeps the serialized body of deterministic GET endpoints, keyed by endpoint,
+path arguments and the query args the view reads, with an ETag. LRU eviction under a byte budget; entries are
+dropped by tag when the data behind them is reloaded.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import NamedTuple
+
+from flask import Response, make_response, request
+
+from common import reload
+
+MAX_BYTES = 16 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    mimetype: str
+    etag: str
+    tag: str
+
+
+class ResponseCache:
+    """LRU of serialized responses, bounded by total body size."""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.generations = {}  # tag -> number of invalidations so far
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def generation(self, tag):
+        """Invalidation count of a tag, read before rendering (see put)."""
+        return self.generations.get(tag, 0)
+
+    def put(self, key, entry, generation=None):
+        """Store an entry, unless its tag was invalidated since generation was read.
+
+        Skipping keeps a body rendered from the old data out of the cache
+        when a reload lands while a slow view is still rendering.
+        """
+        if len(entry.body) > self.max_bytes:
+            return
+        with self.lock:
+            if generation is not None and self.generations.get(entry.tag, 0) != generation:
+                return
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self.entries[key] = entry
+            self.size += len(entry.body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.body)
+
+    def invalidate(self, tag):
+        """Drop every entry built from the given dataset."""
+        with self.lock:
+            self.generations[tag] = self.generations.get(tag, 0) + 1
+            for key in [k for k, e in self.entries.items() if e.tag == tag]:
+                self.size -= len(self.entries.pop(key).body)
+
+    def stats(self):
+        return {'entries': len(self.entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
+
+
+response_cache = ResponseCache()
+
+# Dataset reloads (see common/reload.py) use the dataset name as tag
+reload.on_reload(response_cache.invalidate)
+
+
+def cached(tag, args=()):
+    """Cache a GET view's 200 responses under tag and answer If-None-Match with 304.
+
+    args names the query args the view reads; any other query arg is left
+    out of the key, so junk query strings share the cached entry.
+    """
+    args = tuple(sorted(args))
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*view_args, **kwargs):
+            key = (request.endpoint, tuple(sorted(kwargs.items())),
+                   tuple(request.args.get(name) for name in args))
+            entry = response_cache.get(key)
+
+            if entry is None:
+                generation = response_cache.generation(tag)
+                response = make_response(view(*view_args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    return response
+                body = response.get_data()
+                entry = CachedResponse(body, response.mimetype, hashlib.sha1(body).hexdigest(), tag)
+                response_cache.put(key, entry, generation)
+
+            response = Response(entry.body, mimetype=entry.mimetype)
+            response.set_etag(entry.etag)
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
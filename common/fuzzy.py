@@ -0,0 +1,98 @@
+"""
+Fuzzy name matching
+Accent-folded trigram index: a query only touches the names sharing a
+trigram with it, and only the best few get an exact edit distance.
+"""
+
+import re
+import unicodedata
+from typing import NamedTuple
+
+# Candidates (by trigram similarity) that get an exact edit distance
+SHORTLIST = 5
+
+
+def fold(text):
+    """Lowercase, strip accents and punctuation: 'Théo Ntamack-Muyenga' -> 'theo ntamack muyenga'."""
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, giving up (returns limit + 1) past limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class Match(NamedTuple):
+    id: int  # index of the matched name
+    variant: str  # folded form that matched
+    distance: int
+
+
+class FuzzyIndex:
+    """Index of names, each also reachable by its trailing words (last name
+    alone) and by its leading words (first name + part of a composed last name).
+    """
+
+    def __init__(self, names):
+        self.variants = []  # (name id, folded variant, trigram count)
+        self.grams = {}  # trigram -> variant ids
+
+        for name_id, name in enumerate(names):
+            words = fold(name).split()
+            spans = {' '.join(words[start:]) for start in range(len(words))}
+            spans.update(' '.join(words[:end]) for end in range(2, len(words)))
+            for variant in sorted(spans):
+                variant_id = len(self.variants)
+                grams = trigrams(variant)
+                self.variants.append((name_id, variant, len(grams)))
+                for gram in grams:
+                    self.grams.setdefault(gram, []).append(variant_id)
+
+    def search(self, query, tolerance=0.25):
+        """Best matches for a typed name, one per name, all at the same distance.
+
+        More than one match means the query is ambiguous (e.g. a last name
+        two players share); an empty list, that nothing is close enough. A
+        match may be up to max(1, tolerance * len(variant)) edits away.
+        """
+        query = fold(query)
+        if not query:
+            return []
+
+        query_grams = trigrams(query)
+        hits = {}
+        for gram in query_grams:
+            for variant_id in self.grams.get(gram, ()):
+                hits[variant_id] = hits.get(variant_id, 0) + 1
+
+        # Dice coefficient on trigrams, then exact distance on the shortlist
+        shortlist = sorted(hits, key=lambda v: 2 * hits[v] / (len(query_grams) + self.variants[v][2]),
+                           reverse=True)[:SHORTLIST]
+
+        best = {}  # name id -> its closest match
+        for variant_id in shortlist:
+            name_id, variant, _ = self.variants[variant_id]
+            limit = max(1, int(len(variant) * tolerance))
+            distance = edit_distance(query, variant, limit)
+            if distance <= limit and (name_id not in best or distance < best[name_id].distance):
+                best[name_id] = Match(name_id, variant, distance)
+
+        closest = min((match.distance for match in best.values()), default=None)
+        return [match for match in best.values() if match.distance == closest]
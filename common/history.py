@@ -0,0 +1,202 @@
+"""
+Game history store
+Embedded SQLite database (WAL mode) with one row per answered question and
+per finished game. Writes are queued and inserted in batches by a
+background thread, so requests never wait on the disk. A per-item
+aggregate table is kept up to date with each batch, so the analytics
+queries stay fast however long the history grows.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+DB_PATH = Path(os.environ.get('HISTORY_DB', Path(__file__).parent.parent / "data" / "history.db"))
+
+log = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5  # seconds
+# Rows waiting for the writer; past this (disk stalled) new rows are dropped
+MAX_QUEUED = 100_000
+PLAYER_LENGTH = 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    game TEXT NOT NULL,
+    item TEXT NOT NULL,
+    correct INTEGER NOT NULL,
+    player TEXT
+);
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    game TEXT NOT NULL,
+    player TEXT,
+    score REAL NOT NULL,
+    duration REAL
+);
+CREATE TABLE IF NOT EXISTS item_stats (
+    game TEXT NOT NULL,
+    item TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    correct INTEGER NOT NULL,
+    PRIMARY KEY (game, item)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS answers_game_item ON answers (game, item);
+CREATE INDEX IF NOT EXISTS answers_player_ts ON answers (player, ts);
+CREATE INDEX IF NOT EXISTS games_player_ts ON games (player, ts);
+"""
+
+_queue = queue.Queue(MAX_QUEUED)
+_local = threading.local()
+counters = {'dropped': 0, 'failed': 0}  # rows lost to a full queue / a failed write
+
+
+def connect():
+    """Open a connection in WAL mode (creating the schema if needed)."""
+    DB_PATH.parent.mkdir(exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def reader():
+    """Per-thread read connection."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = _local.conn = connect()
+    return conn
+
+
+def _enqueue(record):
+    """Queue a row without ever blocking the request (counted when dropped)."""
+    try:
+        _queue.put_nowait(record)
+    except queue.Full:
+        counters['dropped'] += 1
+
+
+def _player(player):
+    """Player names come straight from request JSON: any type, any length."""
+    return str(player)[:PLAYER_LENGTH] if player not in (None, '') else None
+
+
+def record_answer(game, item, correct, player=None):
+    """Queue one answered question."""
+    _enqueue(('answer', (time.time(), game, str(item), int(bool(correct)), _player(player))))
+
+
+def record_game(game, score, player=None, duration=None):
+    """Queue one finished game (score and duration must be numbers)."""
+    _enqueue(('game', (time.time(), game, _player(player), float(score),
+                       float(duration) if duration is not None else None)))
+
+
+def write_batch(conn, batch):
+    """Insert a batch and fold its answers into item_stats, in one transaction."""
+    answers = [row for kind, row in batch if kind == 'answer']
+    games = [row for kind, row in batch if kind == 'game']
+
+    totals = {}
+    for _, game, item, correct, _ in answers:
+        attempts, right = totals.get((game, item), (0, 0))
+        totals[(game, item)] = (attempts + 1, right + correct)
+
+    with conn:
+        conn.executemany("INSERT INTO answers (ts, game, item, correct, player) VALUES (?, ?, ?, ?, ?)", answers)
+        conn.executemany("INSERT INTO games (ts, game, player, score, duration) VALUES (?, ?, ?, ?, ?)", games)
+        conn.executemany(
+            "INSERT INTO item_stats (game, item, attempts, correct) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (game, item) DO UPDATE SET attempts = attempts + excluded.attempts, "
+            "correct = correct + excluded.correct",
+            [(game, item, attempts, right) for (game, item), (attempts, right) in totals.items()])
+
+
+def _writer():
+    """Write queued rows in batches until the None sentinel.
+
+    A batch that fails (bad row, locked or unreachable database) is logged
+    and dropped, and the connection reopened: the thread never dies, so
+    the queue keeps draining.
+    """
+    conn = None
+    stop = False
+    while not stop:
+        batch = []
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < BATCH_SIZE:
+            try:
+                record = _queue.get(timeout=max(deadline - time.monotonic(), 0.001))
+            except queue.Empty:
+                break
+            if record is None:
+                stop = True
+                break
+            batch.append(record)
+        if not batch:
+            continue
+        try:
+            conn = conn or connect()
+            write_batch(conn, batch)
+        except Exception:
+            log.exception("Writing %d history rows failed, dropped", len(batch))
+            counters['failed'] += len(batch)
+            if conn is not None:
+                conn.close()
+                conn = None
+    if conn is not None:
+        conn.close()
+
+
+_writer_thread = threading.Thread(target=_writer, name='history-writer', daemon=True)
+_writer_thread.start()
+
+
+@atexit.register
+def flush():
+    """Write what is still queued before the process exits."""
+    try:
+        _queue.put(None, timeout=1)
+    except queue.Full:
+        return
+    _writer_thread.join(timeout=5)
+
+
+def stats():
+    return {'queued': _queue.qsize(), **counters}
+
+
+def hardest_items(game, limit=10, min_attempts=5):
+    """Items with the lowest success rate."""
+    rows = reader().execute(
+        "SELECT item, attempts, correct, CAST(correct AS REAL) / attempts AS accuracy "
+        "FROM item_stats WHERE game = ? AND attempts >= ? ORDER BY accuracy, attempts DESC LIMIT ?",
+        (game, min_attempts, limit))
+    return [{'item': item, 'attempts': attempts, 'correct': correct, 'accuracy': round(accuracy, 3)}
+            for item, attempts, correct, accuracy in rows]
+
+
+def player_progress(player, game=None, limit=50):
+    """A player's latest games (newest first) and answer accuracy."""
+    where, params = ("player = ?", [player]) if game is None else ("player = ? AND game = ?", [player, game])
+    conn = reader()
+    games = conn.execute(
+        f"SELECT ts, game, score, duration FROM games WHERE {where} ORDER BY ts DESC LIMIT ?",
+        (*params, limit)).fetchall()
+    attempts, correct = conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(correct), 0) FROM answers WHERE {where}", params).fetchone()
+    return {
+        'games': [{'date': ts, 'game': g, 'score': score, 'duration': duration} for ts, g, score, duration in games],
+        'answers': attempts,
+        'accuracy': round(correct / attempts, 3) if attempts else None,
+    }
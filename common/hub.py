@@ -0,0 +1,75 @@
+"""
+Server-Sent Events broadcast hub
+Each channel is an append-only event log: an event is serialized once on
+publish and every subscriber reads it from its own cursor, sleeping on a
+condition variable in between (no busy-waiting, no per-client queue).
+"""
+
+import json
+import threading
+
+# Comment line sent when nothing happened, so proxies keep the stream open
+KEEPALIVE = ": keepalive\n\n"
+
+
+class Channel:
+    """One broadcast stream (e.g. a duel room)."""
+
+    def __init__(self, max_events=1000, keepalive=15):
+        self.events = []  # serialized SSE frames
+        self.first_id = 0  # id of self.events[0] once old frames are dropped
+        self.max_events = max_events
+        self.keepalive = keepalive
+        self.closed = False
+        self.subscribers = 0
+        self.condition = threading.Condition()
+
+    @property
+    def last_id(self):
+        return self.first_id + len(self.events)
+
+    def publish(self, event, data):
+        """Append an event and wake every subscriber."""
+        with self.condition:
+            event_id = self.last_id + 1
+            frame = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            self.events.append(frame)
+            if len(self.events) > self.max_events:
+                drop = len(self.events) - self.max_events
+                del self.events[:drop]
+                self.first_id += drop
+            self.condition.notify_all()
+
+    def close(self):
+        """End every subscriber's stream."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def listen(self, last_id=0):
+        """Yield SSE frames from after last_id until the channel closes.
+
+        Pass the Last-Event-ID header as last_id to resume a dropped stream.
+        """
+        cursor = max(last_id, 0)
+        with self.condition:
+            self.subscribers += 1
+        try:
+            while True:
+                with self.condition:
+                    if cursor >= self.last_id and not self.closed:
+                        self.condition.wait(self.keepalive)
+                    start = max(cursor, self.first_id)
+                    frames = self.events[start - self.first_id:]
+                    cursor = self.last_id
+                    closed = self.closed
+
+                if frames:
+                    yield ''.join(frames)
+                elif closed:
+                    return
+                else:
+                    yield KEEPALIVE
+        finally:
+            with self.condition:
+                self.subscribers -= 1
@@ -0,0 +1,90 @@
+"""
+Time-windowed leaderboards
+Keeps an all-time top-K plus one small top-K per day, all updated on
+submit, so today / this week / all time queries only merge a few short
+sorted lists.
+"""
+
+import heapq
+import json
+import threading
+from bisect import insort
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+WINDOWS = ('day', 'week', 'all')
+
+# Daily buckets older than this are dropped (a week always fits)
+RETENTION_DAYS = 7
+
+
+class Leaderboard:
+    """Leaderboard of one game, persisted as a flat JSON list of entries.
+
+    sort_key orders entries best first (e.g. -score then time).
+    """
+
+    def __init__(self, path, sort_key, top_k=100):
+        self.path = path
+        self.sort_key = sort_key
+        self.top_k = top_k
+        self.all_time = []
+        self.buckets = {}  # day -> sorted top-K of that day
+        self.lock = threading.Lock()
+        self.load()
+
+    def _insert(self, entries, entry):
+        """Insert into a sorted list, keeping the top K only."""
+        insort(entries, entry, key=self.sort_key)
+        if len(entries) > self.top_k:
+            entries.pop()
+
+    def _add(self, entry):
+        self._insert(self.all_time, entry)
+        day = datetime.fromisoformat(entry['date']).date()
+        if day >= date.today() - timedelta(days=RETENTION_DAYS):
+            self._insert(self.buckets.setdefault(day, []), entry)
+
+    def _prune(self):
+        """Drop the daily buckets that fell out of the retention window."""
+        oldest = date.today() - timedelta(days=RETENTION_DAYS)
+        for day in [d for d in self.buckets if d < oldest]:
+            del self.buckets[day]
+
+    def add(self, entry):
+        """Add an entry, save, and return its all-time rank (None if not kept)."""
+        with self.lock:
+            self._add(entry)
+            self._prune()
+            self.save()
+            return next((i + 1 for i, e in enumerate(self.all_time) if e is entry), None)
+
+    def top(self, window='all', limit=10):
+        """Best entries of a window: 'day', 'week' (since Monday) or 'all'."""
+        if window == 'all':
+            return self.all_time[:limit]
+
+        today = date.today()
+        first_day = today if window == 'day' else today - timedelta(days=today.weekday())
+        days = [first_day + timedelta(days=i) for i in range((today - first_day).days + 1)]
+        buckets = [self.buckets.get(day, []) for day in days]
+        return list(islice(heapq.merge(*buckets, key=self.sort_key), limit))
+
+    def __len__(self):
+        return len(self.all_time)
+
+    def load(self):
+        """Load entries from file."""
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for entry in json.load(f):
+                    self._add(entry)
+
+    def save(self):
+        """Save the all-time top K plus the entries still in a daily bucket."""
+        kept = {id(e): e for e in self.all_time}
+        for entries in self.buckets.values():
+            kept.update((id(e), e) for e in entries)
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(sorted(kept.values(), key=self.sort_key), f, indent=2, ensure_ascii=False)
@@ -0,0 +1,116 @@
+"""
+Structured logging
+Records are queued by the thread that logs them and written as JSON lines
+by a background listener, so a request never waits on stdout. Requests
+are logged with their route, game, status and latency.
+
+LOG_LEVEL sets the root level (default INFO). LOG_LEVELS overrides single
+loggers, e.g. "requests=WARNING,flag_game=DEBUG".
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+
+from flask import g, request
+
+# Fields copied from the record when a call passes them in extra={...}
+EXTRA_FIELDS = ('route', 'method', 'status', 'latency_ms', 'game')
+
+request_log = logging.getLogger('requests')
+listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extra fields."""
+
+    def format(self, record):
+        line = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                line[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line['exc'] = record.exc_text
+        return json.dumps(line, ensure_ascii=False, default=str)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Queue the record with its message merged but the fields kept apart.
+
+    The stock handler formats the whole record in the calling thread; this
+    one only does what can't wait (merging args, rendering the traceback).
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def parse_levels(spec):
+    """'requests=WARNING,flag_game=DEBUG' -> {'requests': 'WARNING', ...}"""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, level = item.partition('=')
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def setup():
+    """Route every logger through the queue to a JSON stdout writer (once)."""
+    global listener
+    if listener is not None:
+        return listener
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter())
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, output, respect_handler_level=False)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(records)]
+    root.setLevel(os.environ.get('LOG_LEVEL', 'INFO').upper())
+    for name, level in parse_levels(os.environ.get('LOG_LEVELS', '')).items():
+        logging.getLogger(name).setLevel(level)
+    return listener
+
+
+def init_app(app):
+    """Log every request (route, game, status, latency) on the 'requests' logger."""
+    @app.before_request
+    def start_timer():
+        # Checked first so a disabled request log costs one level comparison
+        if request_log.isEnabledFor(logging.INFO):
+            g.log_start = time.perf_counter()
+
+    @app.after_request
+    def log_request(response):
+        if 'log_start' in g:
+            request_log.info('%s %s', request.method, request.path, extra={
+                'route': request.url_rule.rule if request.url_rule else None,
+                'method': request.method,
+                'status': response.status_code,
+                'latency_ms': round((time.perf_counter() - g.log_start) * 1000, 2),
+                'game': request.blueprint,
+            })
+        return response
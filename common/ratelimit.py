@@ -0,0 +1,130 @@
+"""
+Write throttling
+In-memory token buckets checked before a score submission reaches the
+leaderboard file: one per player (client address, room and name), one per
+name in a room, and a much larger one per client address, so a class or a
+family behind one NAT can all submit. The bucket table is an LRU with idle
+expiry, so its memory is bounded.
+
+Behind reverse proxies set TRUSTED_PROXIES to their number: the client
+address is then read from X-Forwarded-For instead of the socket.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import jsonify, request
+
+from common.rooms import request_room
+
+# Score submissions per player: bursts of 10, then one every 10 seconds
+RATE = 0.1  # tokens per second
+BURST = 10
+# Per client address (a whole NAT): bursts of 100, then one a second
+CLIENT_RATE = 1
+CLIENT_BURST = 100
+MAX_KEYS = 10_000
+IDLE_TTL = 600  # seconds before an untouched bucket is dropped
+
+TRUSTED_PROXIES = int(os.environ.get('TRUSTED_PROXIES', 0))
+
+
+class TokenBucketLimiter:
+    """Token buckets for many keys; a request passes only if all its keys have a token."""
+
+    def __init__(self, rate=RATE, burst=BURST, max_keys=MAX_KEYS, idle_ttl=IDLE_TTL):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.idle_ttl = idle_ttl
+        self.buckets = OrderedDict()  # key -> [tokens, last update], least recently used first
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def _bucket(self, key, now):
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(self.burst), now]
+        else:
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            self.buckets.move_to_end(key)
+        return bucket
+
+    def _evict(self, now):
+        """Drop idle buckets (a full bucket is the same as no bucket) and cap the table."""
+        while self.buckets:
+            key, (_, last) = next(iter(self.buckets.items()))
+            if now - last < self.idle_ttl and len(self.buckets) <= self.max_keys:
+                break
+            del self.buckets[key]
+            self.evicted += 1
+
+    def allow(self, *keys):
+        """Take one token from every key's bucket, or from none if one is empty."""
+        now = time.monotonic()
+        with self.lock:
+            buckets = [self._bucket(key, now) for key in keys]
+            ok = all(bucket[0] >= 1 for bucket in buckets)
+            if ok:
+                for bucket in buckets:
+                    bucket[0] -= 1
+                self.allowed += 1
+            else:
+                self.rejected += 1
+            self._evict(now)
+            return ok
+
+    def retry_after(self):
+        return int(1 / self.rate)
+
+    def stats(self):
+        return {'keys': len(self.buckets), 'allowed': self.allowed,
+                'rejected': self.rejected, 'evicted': self.evicted}
+
+
+score_limiter = TokenBucketLimiter()
+client_limiter = TokenBucketLimiter(rate=CLIENT_RATE, burst=CLIENT_BURST)
+
+
+def client_address():
+    """Address of the client; with TRUSTED_PROXIES, the one the outermost proxy saw.
+
+    Each proxy appends the address it got the request from to
+    X-Forwarded-For, so the client is the TRUSTED_PROXIES-th entry from the
+    end (anything before it may be forged by the client).
+    """
+    if TRUSTED_PROXIES:
+        forwarded = [a.strip() for a in request.headers.get('X-Forwarded-For', '').split(',') if a.strip()]
+        if len(forwarded) >= TRUSTED_PROXIES:
+            return forwarded[-TRUSTED_PROXIES]
+    return request.remote_addr
+
+
+def throttle_writes(limiter=score_limiter, message='Too many submissions, try again later'):
+    """Reject a POST with 429 when its player, its name or its client is over the limit."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            data = request.get_json(silent=True)
+            data = data if isinstance(data, dict) else {}
+            client = client_address()
+            room = request_room()
+            name = str(data.get('name') or '')[:20].lower()
+
+            keys = [f"{request.blueprint}:player:{client}:{room}:{name}"]
+            if name:
+                keys.append(f"{request.blueprint}:name:{room}:{name}")
+
+            if not (limiter.allow(*keys) and client_limiter.allow(f"{request.blueprint}:client:{client}")):
+                response = jsonify({'error': message})
+                response.headers['Retry-After'] = str(limiter.retry_after())
+                return response, 429
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,189 @@
+"""
+Per-item difficulty ratings (Elo)
+One slot per flag, player or quiz question, stored in flat arrays and
+updated in O(1) per reported answer. Snapshotted to disk periodically, on
+a background thread so no request waits for the write.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from array import array
+
+log = logging.getLogger(__name__)
+
+# Rating of the (anonymous) player every item plays against
+BASE_RATING = 1500.0
+K_FACTOR = 24.0
+SNAPSHOT_INTERVAL = 60  # seconds
+
+
+class RatingTable:
+    """Elo ratings of the items of one game.
+
+    An item "wins" when the player gets it wrong, so a high rating means a
+    hard item.
+    """
+
+    def __init__(self, path, keys=(), k=K_FACTOR, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.path = path
+        self.k = k
+        self.snapshot_interval = snapshot_interval
+        self.slots = {}
+        self.keys = []
+        self.ratings = array('d')
+        self.attempts = array('I')
+        self.misses = array('I')
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()  # one snapshot written at a time
+        self.last_snapshot = time.monotonic()
+        self.dirty = False
+
+        self.load()
+        for key in keys:
+            self.slot(key)
+        atexit.register(self.flush)
+
+    def slot(self, key):
+        """Slot index of an item, allocating one for a new item."""
+        index = self.slots.get(key)
+        if index is None:
+            with self.lock:
+                index = self.slots.get(key)
+                if index is None:
+                    index = len(self.keys)
+                    self.keys.append(key)
+                    self.ratings.append(BASE_RATING)
+                    self.attempts.append(0)
+                    self.misses.append(0)
+                    self.slots[key] = index
+        return index
+
+    def update(self, key, correct):
+        """Record one answer and return the item's new rating."""
+        index = self.slot(key)
+        with self.lock:
+            rating = self.ratings[index]
+            expected = 1 / (1 + 10 ** ((BASE_RATING - rating) / 400))
+            outcome = 0.0 if correct else 1.0
+            self.ratings[index] = rating + self.k * (outcome - expected)
+            self.attempts[index] += 1
+            self.misses[index] += int(not correct)
+            rating = self.ratings[index]
+            self.dirty = True
+
+            # Claimed under the lock: only one of concurrent answers snapshots
+            now = time.monotonic()
+            due = now - self.last_snapshot >= self.snapshot_interval
+            if due:
+                self.last_snapshot = now
+
+        if due:
+            threading.Thread(target=self.background_snapshot, name='ratings-snapshot',
+                             daemon=True).start()
+        return rating
+
+    def rating(self, key):
+        index = self.slots.get(key)
+        return self.ratings[index] if index is not None else BASE_RATING
+
+    def weights(self, keys):
+        """Sampling weights favouring informative items.
+
+        The weight is p * (1 - p), p being the chance the player answers
+        right: highest for items of about the player's level, low for
+        items everyone gets right (or wrong).
+        """
+        result = []
+        for key in keys:
+            p = 1 / (1 + 10 ** ((self.rating(key) - BASE_RATING) / 400))
+            result.append(p * (1 - p) + 0.01)
+        return result
+
+    def to_dict(self, limit=None):
+        """Items sorted from hardest to easiest."""
+        order = sorted(range(len(self.keys)), key=lambda i: self.ratings[i], reverse=True)
+        return [{
+            'item': self.keys[i],
+            'rating': round(self.ratings[i], 1),
+            'attempts': self.attempts[i],
+            'misses': self.misses[i],
+        } for i in order[:limit]]
+
+    def load(self):
+        """Restore the last snapshot, if any; a corrupt one is logged and ignored."""
+        if not self.path.exists():
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            rows = list(zip(data['keys'], data['ratings'], data['attempts'], data['misses']))
+        except (OSError, ValueError, KeyError, TypeError):
+            log.exception("Unreadable ratings snapshot %s, starting empty", self.path)
+            return
+        for key, rating, attempts, misses in rows:
+            index = self.slot(key)
+            self.ratings[index] = rating
+            self.attempts[index] = attempts
+            self.misses[index] = misses
+
+    def snapshot(self):
+        """Write the table to disk (atomically, through a unique temp file).
+
+        Snapshots are serialized, and each one copies the table once it
+        holds the write lock, so a later snapshot never gets overwritten by
+        an older copy.
+        """
+        with self.write_lock:
+            with self.lock:
+                data = {
+                    'keys': list(self.keys),
+                    'ratings': [round(r, 2) for r in self.ratings],
+                    'attempts': self.attempts.tolist(),
+                    'misses': self.misses.tolist(),
+                }
+                self.last_snapshot = time.monotonic()
+                self.dirty = False
+
+            self.path.parent.mkdir(exist_ok=True)
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=self.path.parent,
+                                             prefix=self.path.stem, suffix='.tmp', delete=False) as f:
+                json.dump(data, f, ensure_ascii=False)
+            try:
+                os.replace(f.name, self.path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+
+    def background_snapshot(self):
+        """Snapshot from the background thread, logging a failed write."""
+        try:
+            self.snapshot()
+        except OSError:
+            log.exception("Could not write ratings snapshot %s", self.path)
+
+    def flush(self):
+        """Snapshot only if something changed since the last one."""
+        if self.dirty:
+            self.snapshot()
+
+
+def report_answer(table, data):
+    """Handle an answer report ({item, correct}); returns (body, status).
+
+    Only items the table already knows are accepted, so clients cannot grow
+    the table, and "correct" must be a JSON boolean.
+    """
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    item = data.get('item')
+    if not isinstance(item, str) or item not in table.slots:
+        return {'error': 'Unknown item'}, 400
+    if not isinstance(data.get('correct'), bool):
+        return {'error': 'Missing or non-boolean correct flag'}, 400
+    rating = table.update(item, data['correct'])
+    return {'item': item, 'rating': round(rating, 1)}, 200
@@ -0,0 +1,100 @@
+"""
+Dataset hot reload
+Each game registers a loader that builds a fresh immutable snapshot and
+swaps it in with a single assignment. Requests that already hold the old
+snapshot finish with it; new ones see the new one.
+
+Reloads are triggered by the /admin/reload endpoint or, with HOT_RELOAD=1,
+by a background thread polling the watched files.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+
+log = logging.getLogger(__name__)
+
+POLL_INTERVAL = 2.0  # seconds
+
+loaders = {}  # name -> (load function, watched paths)
+listeners = []  # called with the dataset name after each reload
+reload_lock = threading.Lock()
+
+
+def register(name, load, watch=()):
+    """Register a dataset loader and the files or folders it reads."""
+    loaders[name] = (load, [Path(p) for p in watch])
+
+
+def on_reload(callback):
+    """Call callback(name) after a dataset was reloaded."""
+    listeners.append(callback)
+    return callback
+
+
+def reload(names=None):
+    """Rebuild and swap the given datasets (all by default).
+
+    Returns {name: seconds taken}, None for a load that failed: loaders
+    raise instead of swapping, so that dataset keeps its previous snapshot
+    and the listeners are not called. Reloads never run concurrently.
+    """
+    timings = {}
+    with reload_lock:
+        for name in names or list(loaders):
+            load, _ = loaders[name]
+            start = time.perf_counter()
+            try:
+                load()
+            except Exception:
+                log.exception("Reloading %s failed, keeping the previous data", name)
+                timings[name] = None
+                continue
+            timings[name] = round(time.perf_counter() - start, 3)
+            for callback in listeners:
+                callback(name)
+    return timings
+
+
+def reload_in_background(names=None):
+    """Run reload() on a separate thread."""
+    thread = threading.Thread(target=reload, args=(names,), name='dataset-reload', daemon=True)
+    thread.start()
+    return thread
+
+
+def signature(paths):
+    """(path, mtime, size) of every file under the watched paths."""
+    files = []
+    for path in paths:
+        candidates = sorted(path.rglob('*')) if path.is_dir() else [path]
+        for file in candidates:
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((str(file), stat.st_mtime_ns, stat.st_size))
+    return tuple(files)
+
+
+def watch(interval=POLL_INTERVAL):
+    """Start a daemon thread reloading datasets whose files changed."""
+    def loop():
+        seen = {name: signature(paths) for name, (_, paths) in loaders.items()}
+        while True:
+            time.sleep(interval)
+            for name, (_, paths) in list(loaders.items()):
+                # One bad pass must not stop the watcher for good
+                try:
+                    current = signature(paths)
+                    if current != seen.get(name):
+                        seen[name] = current
+                        log.info("%s changed on disk, reloading", name)
+                        reload([name])
+                except Exception:
+                    log.exception("Watching %s failed", name)
+
+    thread = threading.Thread(target=loop, name='dataset-watcher', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,140 @@
+"""
+Room leaderboards
+Each room (a family, a class...) gets its own leaderboard file next to the
+game's global one. Only the recently used rooms stay in memory: an LRU
+bounded in size, from which idle rooms are also dropped. The number of
+room files is capped too, since any client can open a room.
+"""
+
+import os
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from flask import request
+
+from common.leaderboard import Leaderboard
+
+# Lowercase letters, digits, - and _ (also the file name)
+ROOM_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,31}$')
+
+MAX_ROOMS = int(os.environ.get('ROOMS_CACHED', 256))
+MAX_ROOM_FILES = int(os.environ.get('ROOM_FILES', 1000))
+IDLE_TTL = 600  # seconds without a read or a score before a room is dropped
+
+
+def request_room():
+    """The room of the request (?room= or "room" in the JSON body), '' for none."""
+    room = request.args.get('room')
+    if room is None and request.is_json:
+        data = request.get_json(silent=True)
+        room = data.get('room') if isinstance(data, dict) else None
+    return str(room or '').strip().lower()
+
+
+class RoomLeaderboards:
+    """The global leaderboard of a game plus one leaderboard per room.
+
+    Room leaderboards are saved on every add, like the global one, so
+    evicting a room only frees its memory: it is read back from its file
+    on the next request. There is never more than one leaderboard per
+    file: a room evicted while a request still holds it is picked up
+    again instead of being read a second time (the two would overwrite
+    each other's scores).
+    """
+
+    def __init__(self, default, folder, sort_key, max_rooms=MAX_ROOMS, idle_ttl=IDLE_TTL,
+                 max_files=MAX_ROOM_FILES):
+        self.default = default
+        self.folder = folder
+        self.sort_key = sort_key
+        self.max_rooms = max_rooms
+        self.idle_ttl = idle_ttl
+        self.max_files = max_files
+        self.rooms = OrderedDict()  # room -> [leaderboard, last use], oldest first
+        self.live = weakref.WeakValueDictionary()  # room -> leaderboard, evicted ones included
+        self.loading = {}  # room -> lock held while its file is read
+        self.lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.files = {path.stem for path in self.folder.glob('*.json')}
+
+    def get(self, room=''):
+        """Leaderboard of a room (the global one for ''), None for an invalid name."""
+        if not room:
+            return self.default
+        if not ROOM_PATTERN.match(room):
+            return None
+
+        board = self._resident(room)
+        if board is not None:
+            return board
+
+        # The file is read outside the store lock, once per room at a time
+        with self.lock:
+            loading = self.loading.setdefault(room, threading.Lock())
+        with loading:
+            board = self._resident(room)
+            if board is not None:
+                return board
+            try:
+                board = Leaderboard(self.folder / f"{room}.json", self.sort_key)
+            finally:
+                with self.lock:
+                    self.loading.pop(room, None)
+
+            with self.lock:
+                self.loads += 1
+                self.live[room] = board
+                self.rooms[room] = [board, time.monotonic()]
+                self._evict(time.monotonic())
+            return board
+
+    def _resident(self, room):
+        """Leaderboard of a room already in memory (marked as used), or None."""
+        now = time.monotonic()
+        with self.lock:
+            slot = self.rooms.get(room)
+            if slot is not None:
+                slot[1] = now
+                self.rooms.move_to_end(room)
+            else:
+                board = self.live.get(room)  # evicted but still held by a request
+                if board is None:
+                    return None
+                slot = self.rooms[room] = [board, now]
+            self._evict(now)
+            return slot[0]
+
+    def reserve(self, room):
+        """Whether a score may be saved in a room: existing rooms always,
+        new ones while there are fewer than max_files room files."""
+        if not room:
+            return True
+        with self.lock:
+            if room not in self.files:
+                if len(self.files) >= self.max_files:
+                    return False
+                self.files.add(room)
+            return True
+
+    def _evict(self, now):
+        """Drop idle rooms and the least recently used ones above max_rooms."""
+        while self.rooms:
+            room, (_, last_use) = next(iter(self.rooms.items()))
+            if len(self.rooms) <= self.max_rooms and now - last_use < self.idle_ttl:
+                break
+            del self.rooms[room]
+            self.evictions += 1
+
+    def for_request(self):
+        """Leaderboard of the request's room (see request_room)."""
+        return self.get(request_room())
+
+    def stats(self):
+        return {'resident': len(self.rooms), 'max_rooms': self.max_rooms,
+                'files': len(self.files), 'max_files': self.max_files,
+                'loads': self.loads, 'evictions': self.evictions}
@@ -0,0 +1,38 @@
+"""
+Seed + index question addressing
+?seed=<any string>&index=<n> builds question n from a private RNG, so the
+same request always returns the same body and can be cached.
+"""
+
+import random
+
+from flask import request
+
+# Seeded responses only change when the data does, any cache may keep them a day
+CACHE_CONTROL = 'public, max-age=86400'
+
+
+def request_rng(game):
+    """Private RNG for ?seed=&index=, or None when the request has no seed."""
+    seed = request.args.get('seed')
+    if seed is None:
+        return None
+    index = request.args.get('index', 0, type=int)
+    return random.Random(f"{game}:{seed}:{index}")
+
+
+def nonce(rng):
+    """Question-token nonce drawn from a seeded RNG (None = random one)."""
+    return f"{rng.getrandbits(48):012x}" if rng is not None else None
+
+
+def make_cacheable(response, rng, deterministic=True):
+    """Mark a seeded response as cacheable by any HTTP cache.
+
+    Pass deterministic=False when the body also depends on live state (e.g.
+    adaptive picks weighted by the current ratings): the seed alone does
+    not pin it, so it must not be cached.
+    """
+    if rng is not None and deterministic:
+        response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
@@ -0,0 +1,247 @@
+"""
+Sealed question tokens
+Stateless encrypted and HMAC-authenticated tokens carrying the correct
+answer, so answers and scores can be checked server-side without keeping
+any session in memory, and without the client being able to read them.
+
+Score tokens are single use: answering or submitting spends one, so an
+older token of the game can't be replayed once its answer is known. Random
+(unseeded) question tokens are single use too; seeded questions can be
+answered by anyone from the NDJSON export, so a game that used one is
+never a trusted score. Spent ids are kept in
+memory for as long as a game may last, per process like the rate limiter.
+
+Set QUESTION_TOKEN_SECRET to the same value on every instance, otherwise
+each process seals with its own random key.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+SECRET = os.environ.get('QUESTION_TOKEN_SECRET', '').encode() or secrets.token_bytes(32)
+
+if not os.environ.get('QUESTION_TOKEN_SECRET'):
+    log.warning("QUESTION_TOKEN_SECRET not set, using a per-process key")
+
+# Separate keys for the keystream and for the MAC, derived from the secret
+ENC_KEY = hmac.new(SECRET, b'token-encryption', hashlib.sha256).digest()
+MAC_KEY = hmac.new(SECRET, b'token-mac', hashlib.sha256).digest()
+ID_KEY = hmac.new(SECRET, b'opaque-id', hashlib.sha256).digest()
+IV_SIZE = 12
+
+# Questions one score token can count. Every nonce of the round is kept,
+# so a replayed question never scores twice; past the cap the round is over.
+MAX_ROUND = 50
+
+# Games whose items are positions answered in order (item i is question i):
+# the count of answered questions is enough to reject replays.
+SEQUENTIAL_GAMES = {'pi'}
+
+# A game (score token chain) or a random question token expires after this;
+# spent ids only need to be remembered that long.
+ROUND_TTL = 3600  # seconds
+MAX_SPENT = 500_000
+
+_spent = OrderedDict()  # spent id -> expiry, oldest first
+_spent_lock = threading.Lock()
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _xor_keystream(iv, data):
+    """XOR data with an HMAC-SHA256 counter-mode keystream (encrypts and decrypts)."""
+    blocks = (len(data) + 31) // 32
+    stream = b''.join(hmac.new(ENC_KEY, iv + i.to_bytes(4, 'big'), hashlib.sha256).digest()
+                      for i in range(blocks))
+    mixed = int.from_bytes(data, 'big') ^ int.from_bytes(stream[:len(data)], 'big')
+    return mixed.to_bytes(len(data), 'big')
+
+
+def seal(payload, iv=None):
+    """Encrypt and authenticate a JSON payload (encrypt-then-MAC).
+
+    iv defaults to a random one; pass a unique one for a reproducible token.
+    """
+    iv = iv or secrets.token_bytes(IV_SIZE)
+    raw = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    body = iv + _xor_keystream(iv, raw)
+    mac = hmac.new(MAC_KEY, body, hashlib.sha256).digest()
+    return f"{_b64encode(body)}.{_b64encode(mac)}"
+
+
+def unseal(token):
+    """Return the payload of a valid token, or None if it was tampered with."""
+    try:
+        body, mac = token.split('.', 1)
+        body = _b64decode(body)
+        expected = hmac.new(MAC_KEY, body, hashlib.sha256).digest()
+        if len(body) <= IV_SIZE or not hmac.compare_digest(expected, _b64decode(mac)):
+            return None
+        return json.loads(_xor_keystream(body[:IV_SIZE], body[IV_SIZE:]))
+    except (AttributeError, ValueError, TypeError):
+        return None
+
+
+def opaque_id(value):
+    """Stable id of a value that clients can't map back to it (keyed hash)."""
+    return hmac.new(ID_KEY, value.encode('utf-8'), hashlib.sha256).hexdigest()[:16]
+
+
+def question_token(game, answer, item=None, nonce=None, reveal=None):
+    """Token for one question: game, correct answer, item id and a nonce.
+
+    Pass a nonce to get a reproducible token (seeded questions): the IV is
+    derived from it, and nonces are unique per question. Without one the
+    token is single use and expires after ROUND_TTL. reveal is returned by
+    check_answer once answered (e.g. the values behind the options).
+    """
+    payload = {'g': game, 'a': answer, 'i': item}
+    if reveal is not None:
+        payload['r'] = reveal
+    if nonce is None:
+        payload.update(n=secrets.token_hex(6), t=int(time.time()))
+    else:
+        payload['n'] = nonce
+    iv = hmac.new(ENC_KEY, f"iv:{game}:{payload['n']}".encode(), hashlib.sha256).digest()[:IV_SIZE]
+    return seal(payload, iv)
+
+
+def score_token(game, score=0, answered=0, started=None, seen=(), seeded=False):
+    """Token carrying a player's running score for one game (single use)."""
+    payload = {
+        'g': game,
+        'id': secrets.token_hex(8),
+        's': score,
+        'q': answered,
+        't': started if started is not None else time.time(),
+        'seen': list(seen),
+    }
+    if seeded:
+        payload['seeded'] = True
+    return seal(payload)
+
+
+def spend(*ids):
+    """Mark ids as used, all or none: False if one of them already was."""
+    now = time.time()
+    with _spent_lock:
+        while _spent and (next(iter(_spent.values())) <= now or len(_spent) + len(ids) > MAX_SPENT):
+            _spent.popitem(last=False)
+        if any(i in _spent for i in ids):
+            return False
+        for i in ids:
+            _spent[i] = now + ROUND_TTL
+        return True
+
+
+def _unseal_score(game, token):
+    """Payload of a valid, unexpired score token of game, else None."""
+    score = unseal(token)
+    if not score or score.get('g') != game or 'id' not in score:
+        return None
+    if time.time() - score['t'] > ROUND_TTL:
+        return None
+    return score
+
+
+def _matches(expected, answer):
+    """Compare answers as strings (clients may send 5 or "5")."""
+    return answer is not None and str(answer).strip() == str(expected).strip()
+
+
+def check_answer(game, data, only=None):
+    """Verify an answer against its question token.
+
+    Returns (body, status). The body holds the correct answer and, when the
+    request carried a score token (or none at all), an updated score token.
+    Multi-part answers (a dict, like name + position) are correct only when
+    every part is, or every part listed in only.
+    """
+    question = unseal((data or {}).get('token'))
+    if not question or question.get('g') != game:
+        return {'error': 'Invalid question token'}, 400
+    if 't' in question and time.time() - question['t'] > ROUND_TTL:
+        return {'error': 'Question expired'}, 409
+
+    expected = question['a']
+    answer = data.get('answer')
+
+    if isinstance(expected, dict):
+        answer = answer if isinstance(answer, dict) else {}
+        parts = {key: _matches(value, answer.get(key)) for key, value in expected.items()
+                 if only is None or key in only}
+        correct = all(parts.values())
+    else:
+        parts = None
+        correct = _matches(expected, answer)
+
+    if data.get('score_token'):
+        score = _unseal_score(game, data['score_token'])
+        if score is None:
+            return {'error': 'Invalid or expired score token'}, 400
+    else:
+        score = {'s': 0, 'q': 0, 't': time.time(), 'seen': []}
+
+    # A question only counts once per game, and a game has a fixed length
+    if game in SEQUENTIAL_GAMES:
+        if question.get('i') != score['q']:
+            return {'error': f"Expected the question at position {score['q']}"}, 409
+    elif question['n'] in score['seen']:
+        return {'error': 'Question already answered in this game'}, 409
+    elif score['q'] >= MAX_ROUND:
+        return {'error': f'Game over after {MAX_ROUND} questions, start a new one'}, 409
+    else:
+        score['seen'].append(question['n'])
+
+    # Spend the score token (and a random question) so neither can answer again
+    spent = [f"q:{question['n']}"] if 't' in question else []
+    if 'id' in score:
+        spent.append(f"s:{score['id']}")
+    if not spend(*spent):
+        return {'error': 'Token already used, continue with the latest score token'}, 409
+
+    score['s'] += int(correct)
+    score['q'] += 1
+    seeded = score.get('seeded', False) or 't' not in question
+
+    body = {
+        'correct': correct,
+        'correct_answer': expected,
+        'item': question.get('i'),
+        'score': score['s'],
+        'answered': score['q'],
+        'score_token': score_token(game, score['s'], score['q'], score['t'], score['seen'], seeded),
+    }
+    if parts is not None:
+        body['parts'] = parts
+    if 'r' in question:
+        body['reveal'] = question['r']
+    return body, 200
+
+
+def trusted_score(game, token):
+    """Return (score, elapsed seconds) from a valid score token, else None.
+
+    The token is spent: a game is submitted once, with its latest token.
+    Games with a seeded question are not trusted (their answers are public).
+    """
+    score = _unseal_score(game, token)
+    if score is None or score.get('seeded') or not spend(f"s:{score['id']}"):
+        return None
+    return score['s'], round(time.time() - score['t'], 3)
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Flag Duel - head-to-head mode
+Every player of a room gets the same question sequence and live scores,
+pushed over Server-Sent Events. Joining returns a player token that
+answers must carry; a question nobody finished is revealed after
+QUESTION_TIME seconds.
+"""
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+import secrets
+import threading
+import time
+
+from common.hub import Channel
+from common.ratelimit import TokenBucketLimiter, throttle_writes
+from flag_game import game
+
+# Create blueprint
+flag_duel_bp = Blueprint('flag_duel', __name__)
+
+MAX_ROOMS = 1000
+MAX_PLAYERS = 8
+ROOM_TTL = 3600  # seconds
+QUESTION_TIME = 20  # seconds to answer before the question is revealed anyway
+
+# Room creation per client: bursts of 3, then one a minute (rooms live an hour)
+room_limiter = TokenBucketLimiter(rate=1 / 60, burst=3)
+
+rooms = {}
+rooms_lock = threading.Lock()
+
+
+class DuelRoom:
+    """One duel: a fixed question sequence, the players and their scores."""
+
+    def __init__(self, n_questions, difficulty):
+        self.id = secrets.token_urlsafe(6)
+        self.created = time.time()
+        self.questions = [game.build_question(difficulty=difficulty) for _ in range(n_questions)]
+        self.scores = {}
+        self.players = {}  # token -> name
+        self.answered = set()
+        self.current = -1
+        self.timer = None  # reveals the current question at its deadline
+        self.lock = threading.Lock()
+        self.channel = Channel()
+
+    @property
+    def finished(self):
+        return self.current >= len(self.questions)
+
+    def public_question(self):
+        """Current question without its answer (nor the values that give it away)."""
+        question = self.questions[self.current]
+        return {
+            'index': self.current,
+            'total': len(self.questions),
+            'question': question['question'],
+            'metric': question['metric'],
+            'options': [{'name': o['name'], 'iso2': o['iso2']} for o in question['options']],
+            'time': QUESTION_TIME,
+        }
+
+    def join(self, name):
+        """Add a player: (token, players), or None if the room is full or the name taken."""
+        with self.lock:
+            if name in self.scores or len(self.scores) >= MAX_PLAYERS:
+                return None
+            token = secrets.token_urlsafe(16)
+            self.players[token] = name
+            self.scores[name] = 0
+            self.channel.publish('players', {'scores': dict(self.scores)})
+            return token, list(self.scores)
+
+    def advance(self):
+        """Move to the next question (or end the duel). Call with the lock held."""
+        if self.timer is not None:
+            self.timer.cancel()
+        self.current += 1
+        self.answered = set()
+        if self.finished:
+            self.channel.publish('end', {'scores': dict(self.scores)})
+            self.channel.close()
+        else:
+            self.timer = threading.Timer(QUESTION_TIME, self.expire, (self.current,))
+            self.timer.daemon = True
+            self.timer.start()
+            self.channel.publish('question', self.public_question())
+
+    def reveal(self):
+        """Publish the answer and move on. Call with the lock held."""
+        question = self.questions[self.current]
+        self.channel.publish('reveal', {
+            'index': self.current,
+            'correct_answer': question['correct_answer'],
+            'values': {o['name']: o['value'] for o in question['options']},
+        })
+        self.advance()
+
+    def expire(self, index):
+        """Deadline of question index (timer thread): reveal it if still open."""
+        with self.lock:
+            if self.current == index and not self.finished:
+                self.reveal()
+
+    def close(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+            self.channel.close()
+
+    def start(self, token):
+        """Start the duel; only a player of the room may. False otherwise."""
+        with self.lock:
+            if token not in self.players:
+                return False
+            if self.current == -1:
+                self.advance()
+            return True
+
+    def answer(self, token, answer):
+        """Score the answer of the player holding token: (correct, scores) or None.
+
+        The next question comes once everyone answered (or at the deadline).
+        """
+        with self.lock:
+            name = self.players.get(token)
+            if name is None or self.current < 0 or self.finished or name in self.answered:
+                return None
+            correct = answer == self.questions[self.current]['correct_answer']
+            self.scores[name] += int(correct)
+            self.answered.add(name)
+            scores = dict(self.scores)
+            self.channel.publish('scores', {'scores': scores, 'answered': sorted(self.answered)})
+
+            if self.answered >= self.scores.keys():
+                self.reveal()
+            return correct, scores
+
+
+def get_room(room_id):
+    return rooms.get(room_id)
+
+
+def prune_rooms():
+    """Drop rooms older than ROOM_TTL."""
+    now = time.time()
+    with rooms_lock:
+        for room_id in [r for r, room in rooms.items() if now - room.created > ROOM_TTL]:
+            rooms.pop(room_id).close()
+
+
+def request_data():
+    """JSON object body of the request ({} when missing or not an object)."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
+@flag_duel_bp.route('/rooms', methods=['POST'])
+@throttle_writes(room_limiter, 'Too many rooms created, try again later')
+def create_room():
+    """Create a duel room ({n, difficulty} optional)."""
+    data = request_data()
+    difficulty = str(data.get('difficulty', 'easy'))
+    try:
+        n_questions = min(max(int(data.get('n', 10)), 1), 50)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'n must be a number'}), 400
+
+    if difficulty not in game.DIFFICULTY_WINDOWS:
+        return jsonify({'error': f'Unknown difficulty {difficulty}'}), 400
+    if len(game.snapshot.countries) < 4:
+        return jsonify({'error': 'Not enough countries loaded'}), 404
+
+    prune_rooms()
+    room = DuelRoom(n_questions, difficulty)
+    with rooms_lock:
+        if len(rooms) >= MAX_ROOMS:
+            return jsonify({'error': 'Too many rooms'}), 503
+        rooms[room.id] = room
+
+    return jsonify({'room': room.id, 'questions': n_questions})
+
+
+@flag_duel_bp.route('/rooms/<room_id>/join', methods=['POST'])
+def join_room(room_id):
+    """Join a room with a name; the returned token identifies the player."""
+    room = get_room(room_id)
+    data = request_data()
+    name = str(data.get('name', ''))[:20]
+
+    if room is None:
+        return jsonify({'error': 'Unknown room'}), 404
+    if not name:
+        return jsonify({'error': 'Missing name'}), 400
+
+    joined = room.join(name)
+    if joined is None:
+        return jsonify({'error': 'Room is full or name taken'}), 409
+
+    token, players = joined
+    return jsonify({'success': True, 'token': token, 'players': players})
+
+
+@flag_duel_bp.route('/rooms/<room_id>/start', methods=['POST'])
+def start_room(room_id):
+    """Push the first question to everyone ({token} of a player of the room)."""
+    room = get_room(room_id)
+    if room is None:
+        return jsonify({'error': 'Unknown room'}), 404
+    if not room.start(str(request_data().get('token', ''))):
+        return jsonify({'error': 'Only a player of the room can start it'}), 403
+    return jsonify({'success': True})
+
+
+@flag_duel_bp.route('/rooms/<room_id>/answer', methods=['POST'])
+def answer_room(room_id):
+    """Answer the current question ({token, answer}, token from join)."""
+    room = get_room(room_id)
+    data = request_data()
+
+    if room is None:
+        return jsonify({'error': 'Unknown room'}), 404
+
+    result = room.answer(str(data.get('token', '')), data.get('answer'))
+    if result is None:
+        return jsonify({'error': 'Not playing or already answered'}), 409
+
+    correct, scores = result
+    return jsonify({'correct': correct, 'scores': scores})
+
+
+@flag_duel_bp.route('/rooms/<room_id>/events')
+def room_events(room_id):
+    """Server-Sent Events stream of a room (players, question, scores, reveal, end)."""
+    room = get_room(room_id)
+    if room is None:
+        return jsonify({'error': 'Unknown room'}), 404
+
+    last_id = request.headers.get('Last-Event-ID', 0, type=int)
+    return Response(stream_with_context(room.channel.listen(last_id)),
+                    mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
@@ -8,8 +8,20 @@ from flask import Blueprint, render_template, jsonify, send_from_directory, requ
 import random
 import csv
 import json
+import logging
 from pathlib import Path
 from datetime import datetime
+from typing import NamedTuple
+
+from common import history, reload, seeding, tokens
+from common.leaderboard import Leaderboard, WINDOWS
+from common.ratelimit import throttle_writes
+from common.rooms import RoomLeaderboards, request_room
+from common.assets import asset_store
+from common.cache import cached
+from common.ratings import RatingTable, report_answer
+
+log = logging.getLogger(__name__)
 
 # Create blueprint
 flag_game_bp = Blueprint('flag_game', __name__,
@@ -17,153 +29,372 @@ flag_game_bp = Blueprint('flag_game', __name__,
                          static_folder='static')
 
 FLAGS_FOLDER = Path(__file__).parent / "flags"
-countries_data = []
+CSV_PATH = Path(__file__).parent / 'stats/countries.csv'
+# Nearest look-alike flags of each flag, built by python -m tools.flag_neighbours
+NEIGHBOURS_FILE = Path(__file__).parent / "data" / "flag_neighbours.json"
+
+# Metrics a question can compare on
+METRICS = ['population', 'area', 'gdp', 'density', 'gdp_per_capita', 'median_age']
+
+
+# Width of the rank window the 4 options are drawn from (None = all ranks).
+# A tight window means close values, so a harder question.
+DIFFICULTY_WINDOWS = {
+    'easy': None,
+    'medium': 40,
+    'hard': 12,
+}
+
+
+# Categorical columns usable as themes (e.g. ?continent=Africa&driving_side=left)
+THEME_ATTRIBUTES = ['continent', 'language', 'religion', 'driving_side', 'un_member', 'currency']
+
+
+class CountrySnapshot(NamedTuple):
+    """Immutable country dataset with its indexes, swapped as a whole on reload."""
+    countries: tuple
+    # For each metric, indices into countries sorted by value (highest first),
+    # countries without data left out. Rank 0 is the biggest.
+    metric_ranks: dict
+    # For each metric, the rank of every country id (None without data)
+    metric_positions: dict
+    # Bitsets over country ids (bit i = countries[i]), stored as Python ints:
+    # one per metric (countries with data) and one per theme value
+    metric_masks: dict
+    theme_masks: dict  # attribute -> lowercase value -> bitset
+    # Country id -> ids of the most similar flags, closest first
+    lookalikes: dict
+
+
+snapshot = CountrySnapshot((), {}, {}, {}, {}, {})
+
+# Anchors tried before giving up on a look-alike question (themes can
+# leave a flag with fewer than 3 usable neighbours)
+LOOKALIKE_TRIES = 8
 
 # Add this near the top of your file
 LEADERBOARD_FILE = Path(__file__).parent / "data" / "flag_leaderboard.json"
 LEADERBOARD_FILE.parent.mkdir(exist_ok=True)
 
+# Difficulty rating of each flag (one slot per iso2)
+ratings = RatingTable(Path(__file__).parent / "data" / "flag_ratings.json")
 
-def load_leaderboard():
-    """Load leaderboard from file."""
-    if LEADERBOARD_FILE.exists():
-        with open(LEADERBOARD_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
 
+# Sorted best first: all-time top 100 plus per-day buckets for the windows
+leaderboard = Leaderboard(LEADERBOARD_FILE, sort_key=lambda x: (-x['score'], x['time']))
 
-def save_leaderboard(leaderboard):
-    """Save leaderboard to file."""
-    with open(LEADERBOARD_FILE, 'w', encoding='utf-8') as f:
-        json.dump(leaderboard, f, indent=2, ensure_ascii=False)
+# One leaderboard per room (?room=), only the recently used ones in memory
+rooms = RoomLeaderboards(leaderboard, LEADERBOARD_FILE.parent / "rooms", leaderboard.sort_key)
 
 
 # Add these routes to your blueprint
 @flag_game_bp.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
-    """Get top 10 scores."""
-    leaderboard = load_leaderboard()
-    # Sort by score (desc), then by time (asc)
-    leaderboard.sort(key=lambda x: (-x['score'], x['time']))
-    return jsonify({'leaderboard': leaderboard[:10]})
+    """Get top 10 scores of a window (?window=day, week or all) and room (?room=)."""
+    window = request.args.get('window', 'all')
+    if window not in WINDOWS:
+        return jsonify({'error': f'Unknown window {window}'}), 400
+
+    room = request_room()
+    board = rooms.get(room)
+    if board is None:
+        return jsonify({'error': f'Invalid room {room}'}), 400
+    return jsonify({'window': window, 'room': room or None, 'leaderboard': board.top(window, 10)})
 
 
 @flag_game_bp.route('/api/submit-score', methods=['POST'])
+@throttle_writes()
 def submit_score():
-    """Submit a new score."""
-    data = request.json
+    """Submit a new score (to a room's leaderboard with "room")."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    room = request_room()
+    board = rooms.get(room)
+    if board is None:
+        return jsonify({'error': f'Invalid room {room}'}), 400
+
+    # A signed score token (from /api/verify) replaces the client's own numbers
+    if data.get('score_token'):
+        trusted = tokens.trusted_score('flag', data['score_token'])
+        if trusted is None:
+            return jsonify({'error': 'Invalid score token'}), 400
+        data['score'], data['time'] = trusted
 
     # Validate data
     if not data.get('name') or data.get('score') is None or data.get('time') is None:
         return jsonify({'error': 'Missing required fields'}), 400
 
-    leaderboard = load_leaderboard()
-
     # Add new entry
-    entry = {
-        'name': data['name'][:20],  # Limit name length
-        'score': int(data['score']),
-        'time': float(data['time']),
-        'date': datetime.now().isoformat()
-    }
-
-    leaderboard.append(entry)
-
-    # Keep only top 100 to prevent file from growing too large
-    leaderboard.sort(key=lambda x: (-x['score'], x['time']))
-    leaderboard = leaderboard[:100]
-
-    save_leaderboard(leaderboard)
-
-    # Return rank
-    rank = next((i + 1 for i, e in enumerate(leaderboard) if e == entry), None)
+    try:
+        entry = {
+            'name': str(data['name'])[:20],  # Limit name length
+            'score': int(data['score']),
+            'time': float(data['time']),
+            'date': datetime.now().isoformat(),
+            'verified': bool(data.get('score_token'))
+        }
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid score or time'}), 400
+
+    # Only now may a new room claim one of the ROOM_FILES slots
+    if not rooms.reserve(room):
+        return jsonify({'error': 'Too many rooms, pick an existing one'}), 403
+
+    # Keeps the top 100, plus today's and this week's buckets
+    rank = board.add(entry)
+    history.record_game('flag', entry['score'], entry['name'], entry['time'])
 
     return jsonify({
         'success': True,
         'rank': rank,
-        'total': len(leaderboard)
+        'room': room or None,
+        'total': len(board)
     })
 
 @flag_game_bp.route('/api/all-countries')
+@cached('countries')
 def get_all_countries():
     """Get all countries data for offline mode."""
     return jsonify({
-        'countries': countries_data
+        'countries': snapshot.countries
     })
 
 def load_countries():
-    """Load country data from CSV."""
-    global countries_data
+    """Load country data from CSV into a new snapshot and swap it in.
+
+    Raises on a broken file (e.g. caught halfway through an edit), leaving
+    the current snapshot in place.
+    """
+    global snapshot
     countries_data = []
 
-    csv_path = Path(__file__).parent / 'stats/countries.csv'
+    with open(CSV_PATH, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+        f.seek(0)
 
-    try:
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-            f.seek(0)
+        delimiter = '\t' if '\t' in first_line else ','
+        reader = csv.DictReader(f, delimiter=delimiter)
 
-            delimiter = '\t' if '\t' in first_line else ','
-            reader = csv.DictReader(f, delimiter=delimiter)
+        for row in reader:
+            iso2 = None
+            for key in ['iso2', 'ISO2', 'id', 'Id', 'ID']:
+                if key in row and row[key]:
+                    iso2 = row[key]
+                    break
 
-            for row in reader:
-                iso2 = None
-                for key in ['iso2', 'ISO2', 'id', 'Id', 'ID']:
-                    if key in row and row[key]:
-                        iso2 = row[key]
-                        break
+            if not iso2:
+                continue
 
-                if not iso2:
+            flag_file = FLAGS_FOLDER / f"{iso2.lower()}.png"
+            if not flag_file.exists():
+                flag_file = FLAGS_FOLDER / f"{iso2.upper()}.png"
+                if not flag_file.exists():
                     continue
 
-                flag_file = FLAGS_FOLDER / f"{iso2.lower()}.png"
-                if not flag_file.exists():
-                    flag_file = FLAGS_FOLDER / f"{iso2.upper()}.png"
-                    if not flag_file.exists():
-                        continue
-
-                def safe_int(value):
-                    try:
-                        if not value or not str(value).strip():
-                            return 0
-                        clean_value = str(value).replace(',', '').replace(' ', '')
-                        return int(float(clean_value))
-                    except:
+            def safe_int(value):
+                try:
+                    if not value or not str(value).strip():
                         return 0
-
-                def safe_float(value):
-                    try:
-                        if not value or not str(value).strip():
-                            return 0.0
-                        clean_value = str(value).replace(',', '').replace(' ', '')
-                        return float(clean_value)
-                    except:
+                    clean_value = str(value).replace(',', '').replace(' ', '')
+                    return int(float(clean_value))
+                except:
+                    return 0
+
+            def safe_float(value):
+                try:
+                    if not value or not str(value).strip():
                         return 0.0
+                    clean_value = str(value).replace(',', '').replace(' ', '')
+                    return float(clean_value)
+                except:
+                    return 0.0
+
+            population = safe_int(row.get('population', 0))
+            gdp = safe_int(row.get('gdp', 0))
+
+            # Calculate GDP per capita (in dollars)
+            # GDP is in millions, so multiply by 1,000,000 then divide by population
+            gdp_per_capita = (gdp * 1_000_000 / population) if population > 0 else 0
+
+            countries_data.append({
+                'name': row.get('country', 'Unknown'),
+                'iso2': iso2.lower(),
+                'population': population,
+                'area': safe_int(row.get('area', 0)),
+                'gdp': gdp,
+                'density': safe_float(row.get('density', 0)),
+                'gdp_per_capita': round(gdp_per_capita, 2),
+                'median_age': safe_float(row.get('median_age', 0)),
+                'continent': row.get('continent', ''),
+                'language': row.get('language', ''),
+                'religion': row.get('religion', ''),
+                'driving_side': row.get('driving_side', ''),
+                'un_member': row.get('un_member', '').upper() == 'TRUE',
+                'currency': row.get('currency', '')
+            })
+
+    if not countries_data:
+        raise ValueError(f"No country with a flag in {CSV_PATH.name}")
+
+    for country in countries_data:
+        ratings.slot(country['iso2'])
+
+    # Single assignment: requests see either the old or the new snapshot
+    metric_ranks = build_metric_ranks(countries_data)
+    snapshot = CountrySnapshot(
+        countries=tuple(countries_data),
+        metric_ranks=metric_ranks,
+        metric_positions=build_metric_positions(metric_ranks, len(countries_data)),
+        metric_masks={metric: to_mask(ranks) for metric, ranks in metric_ranks.items()},
+        theme_masks=build_theme_masks(countries_data),
+        lookalikes=load_lookalikes(countries_data)
+    )
+    log.info("Loaded %d countries for flag game", len(countries_data))
+    return snapshot
+
+
+def load_lookalikes(countries):
+    """Map country ids to their look-alike country ids (empty without the table)."""
+    if not NEIGHBOURS_FILE.exists():
+        return {}
+
+    with open(NEIGHBOURS_FILE, 'r', encoding='utf-8') as f:
+        neighbours = json.load(f)['neighbours']
+
+    ids = {country['iso2']: i for i, country in enumerate(countries)}
+    return {
+        ids[iso2]: tuple(ids[other] for other in others if other in ids)
+        for iso2, others in neighbours.items() if iso2 in ids
+    }
 
-                population = safe_int(row.get('population', 0))
-                gdp = safe_int(row.get('gdp', 0))
 
-                # Calculate GDP per capita (in dollars)
-                # GDP is in millions, so multiply by 1,000,000 then divide by population
-                gdp_per_capita = (gdp * 1_000_000 / population) if population > 0 else 0
+def build_metric_ranks(countries):
+    """Precompute the rank array of every metric."""
+    return {
+        metric: tuple(sorted((i for i, c in enumerate(countries) if c[metric] > 0),
+                             key=lambda i: countries[i][metric], reverse=True))
+        for metric in METRICS
+    }
 
-                countries_data.append({
-                    'name': row.get('country', 'Unknown'),
-                    'iso2': iso2.lower(),
-                    'population': population,
-                    'area': safe_int(row.get('area', 0)),
-                    'gdp': gdp,
-                    'density': safe_float(row.get('density', 0)),
-                    'gdp_per_capita': round(gdp_per_capita, 2)  # ADD THIS
-                })
 
-        print(f"✓ Loaded {len(countries_data)} countries for flag game")
-        return countries_data
-    except Exception as e:
-        print(f"Error loading CSV: {e}")
-        import traceback
-        traceback.print_exc()
-        return []
+def build_metric_positions(metric_ranks, count):
+    """Invert the rank arrays: rank of each country id, per metric."""
+    positions = {}
+    for metric, ranks in metric_ranks.items():
+        position = [None] * count
+        for rank, country_id in enumerate(ranks):
+            position[country_id] = rank
+        positions[metric] = tuple(position)
+    return positions
+
+
+def to_mask(country_ids):
+    """Bitset with the bits of the given country ids set."""
+    mask = 0
+    for country_id in country_ids:
+        mask |= 1 << country_id
+    return mask
+
+
+def mask_ids(mask):
+    """Country ids of the bits set in a bitset, lowest first."""
+    ids = []
+    while mask:
+        low_bit = mask & -mask
+        ids.append(low_bit.bit_length() - 1)
+        mask ^= low_bit
+    return ids
+
+
+def build_theme_masks(countries):
+    """One bitset per value of every theme attribute."""
+    masks = {attribute: {} for attribute in THEME_ATTRIBUTES}
+    for country_id, country in enumerate(countries):
+        for attribute in THEME_ATTRIBUTES:
+            value = str(country[attribute]).strip().lower()
+            if value:
+                masks[attribute][value] = masks[attribute].get(value, 0) | (1 << country_id)
+    return masks
+
+
+def theme_mask(snap, filters):
+    """Combine theme filters into one bitset.
+
+    filters maps an attribute to a list of values: values of one attribute
+    are OR-ed, attributes are AND-ed. Returns None when there is no filter.
+    """
+    mask = None
+    for attribute, values in filters.items():
+        attribute_mask = 0
+        for value in values:
+            attribute_mask |= snap.theme_masks[attribute].get(value.strip().lower(), 0)
+        mask = attribute_mask if mask is None else mask & attribute_mask
+    return mask
+
+
+def request_theme():
+    """Theme filters from the query string (?continent=Africa,Asia&driving_side=left)."""
+    filters = {}
+    for attribute in THEME_ATTRIBUTES:
+        values = [v for arg in request.args.getlist(attribute) for v in arg.split(',') if v.strip()]
+        if values:
+            filters[attribute] = values
+    return filters
+
+
+def sample_by_rank(ranks, window, k=4, rng=random, values=None):
+    """Pick k countries whose ranks fall in one window of the given width.
+
+    Draws a window start, then k distinct ranks inside it: no rejection loop,
+    so a hard question costs the same as a random one. Returns the ranks
+    sorted, so the first one is the correct answer.
+
+    values (the metric value of each rank) keeps tied countries apart: the
+    window grows until it holds k distinct values and one rank is drawn per
+    value, so there is never a second right answer. None when the ranks
+    don't have k distinct values.
+    """
+    if window is None or window > len(ranks):
+        window = len(ranks)
+    window = max(window, k)
+
+    start = rng.randint(0, len(ranks) - window)
+    if values is None:
+        return sorted(rng.sample(range(start, start + window), k))
+
+    end = start + window
+    while len(set(values[start:end])) < k:
+        if end < len(ranks):
+            end += 1
+        elif start > 0:
+            start -= 1
+        else:
+            return None
+
+    by_value = {}
+    for rank in range(start, end):
+        by_value.setdefault(values[rank], []).append(rank)
+    return sorted(rng.choice(by_value[value]) for value in rng.sample(list(by_value), k))
+
+
+def sample_lookalikes(snap, candidates, allowed, metric, rng=random, k=4):
+    """Pick a random flag plus its k-1 closest look-alikes within a bitset.
+
+    Each try is a lookup in the precomputed neighbour table, so the cost
+    doesn't depend on the number of countries. Groups where two countries
+    tie for the best metric value are skipped. Returns country ids, or None
+    when no anchor has enough allowed neighbours.
+    """
+    for _ in range(LOOKALIKE_TRIES):
+        anchor = rng.choice(candidates)
+        others = [i for i in snap.lookalikes.get(anchor, ()) if allowed >> i & 1][:k - 1]
+        if len(others) == k - 1:
+            top = sorted((snap.countries[i][metric] for i in [anchor] + others), reverse=True)
+            if top[0] != top[1]:
+                return [anchor] + others
+    return None
 
 
 @flag_game_bp.route('/')
@@ -174,32 +405,76 @@ def index():
 
 @flag_game_bp.route('/flags/<path:filename>')
 def serve_flag(filename):
-    """Serve flag images."""
-    return send_from_directory(FLAGS_FOLDER, filename)
-
-
-@flag_game_bp.route('/api/question')
-def get_question():
-    """Get a random comparison question."""
-    if len(countries_data) < 4:
-        return jsonify({'error': 'Not enough countries loaded'}), 404
-
-    metrics = ['population', 'area', 'gdp', 'density']
-    metric = random.choice(metrics)
-
-    valid_countries = [c for c in countries_data if c[metric] > 0]
-
-    if len(valid_countries) < 4:
-        return jsonify({'error': f'Not enough countries with {metric} data'}), 404
-
-    random.shuffle(valid_countries)
-    selected_countries = valid_countries[:4]
-
-    sorted_countries = sorted(selected_countries, key=lambda x: x[metric], reverse=True)
-    correct_country = sorted_countries[0]
-
-    # Rugby field conversion constant (1 field ≈ 10,000 m²)
-    RUGBY_FIELD_SIZE = 10000  # m²
+    """Serve flag images (from memory when the asset store is enabled)."""
+    return asset_store.response('flags', filename) or send_from_directory(FLAGS_FOLDER, filename)
+
+
+# Rugby field conversion constant (1 field ≈ 10,000 m²)
+RUGBY_FIELD_SIZE = 10000  # m²
+
+QUESTION_TEXTS = {
+    'population': 'Allez ma loute, quel pays a la plus grande population ?',
+    'area': 'Quel pays a la plus grande superficie ?',
+    'gdp': 'Quel pays a le plus grand PIB ? (pas par habitant hein)',
+    'density': 'Quel pays à la plus forte densité ?',
+    'gdp_per_capita': 'Quel pays a le plus grand PIB par habitant ?',
+    'median_age': 'Quel pays a la population la plus âgée (âge médian) ?'
+}
+
+
+def build_question(metric=None, difficulty='easy', rng=None, theme=None, lookalike=False):
+    """Build one comparison question.
+
+    metric defaults to a random one. rng is a seeded random.Random for
+    reproducible questions (defaults to the shared random module). theme
+    is a filter dict (see theme_mask) restricting the candidate countries.
+    lookalike picks the 3 wrong options among the flags most similar to
+    the first one instead of by rank.
+    Returns None when there are not enough countries with data for the
+    metric (and theme).
+    """
+    snap = snapshot
+    token_nonce = seeding.nonce(rng)
+    rng = rng or random
+
+    mask = theme_mask(snap, theme) if theme else None
+    if theme:
+        if metric is None:
+            # Only the metrics with enough countries in the theme
+            usable = [m for m in METRICS if (mask & snap.metric_masks.get(m, 0)).bit_count() >= 4]
+            if not usable:
+                return None
+            metric = rng.choice(usable)
+
+        # Candidates straight from the bitsets, put back in rank order
+        mask &= snap.metric_masks.get(metric, 0)
+        ranks = sorted(mask_ids(mask), key=snap.metric_positions[metric].__getitem__)
+    else:
+        metric = metric or rng.choice(METRICS)
+        ranks = snap.metric_ranks.get(metric, ())
+
+    if len(ranks) < 4:
+        return None
+
+    if lookalike:
+        allowed = snap.metric_masks.get(metric, 0) if mask is None else mask
+        selected = sample_lookalikes(snap, ranks, allowed, metric, rng)
+        if selected is None:
+            return None
+        selected.sort(key=snap.metric_positions[metric].__getitem__)
+        return make_question(metric, difficulty, [snap.countries[i] for i in selected], rng, token_nonce)
+
+    values = [snap.countries[i][metric] for i in ranks]
+    picked = sample_by_rank(ranks, DIFFICULTY_WINDOWS[difficulty], rng=rng, values=values)
+    if picked is None:
+        return None
+    selected_countries = [snap.countries[ranks[r]] for r in picked]
+    return make_question(metric, difficulty, selected_countries, rng, token_nonce)
+
+
+def make_question(metric, difficulty, selected_countries, rng, token_nonce=None):
+    """Question body for countries already picked, the correct one first."""
+    correct_country = selected_countries[0]
 
     options = []
     for country in selected_countries:
@@ -214,22 +489,169 @@ def get_question():
             'value': value
         })
 
-    random.shuffle(options)
+    rng.shuffle(options)
 
-    question_texts = {
-        'population': 'Allez ma loute, quel pays a la plus grande population ?',
-        'area': 'Quel pays a la plus grande superficie ?',
-        'gdp': 'Quel pays a le plus grand PIB ? (pas par habitant hein)',
-        'density': 'Quel pays à la plus forte densité ?'
+    return {
+        'question': QUESTION_TEXTS[metric],
+        'metric': metric,
+        'difficulty': difficulty,
+        'options': options,
+        'correct_answer': correct_country['name'],
+        'token': tokens.question_token('flag', correct_country['name'], correct_country['iso2'], token_nonce,
+                                       reveal={country['name']: country[metric] for country in selected_countries})
     }
 
+
+def hide_answer(question):
+    """Leave out what gives the answer away (its token returns it once answered)."""
+    del question['correct_answer']
+    for option in question['options']:
+        del option['value']
+    return question
+
+
+def build_round(n, rng=None, theme=None, metric=None, difficulty='easy'):
+    """Deal up to n questions where no country appears twice.
+
+    Like build_question, each question draws its 4 countries from a rank
+    window of the difficulty, for the given metric (a random one with
+    enough countries left otherwise); the candidates are the pool bitset
+    (every country, or the theme's) minus the countries already dealt.
+    """
+    snap = snapshot
+    seeded = rng is not None
+    rng = rng or random
+    pool = theme_mask(snap, theme) if theme else (1 << len(snap.countries)) - 1
+
+    questions = []
+    while len(questions) < n:
+        token_nonce = seeding.nonce(rng) if seeded else None
+        usable = [m for m in ([metric] if metric else METRICS)
+                  if (pool & snap.metric_masks.get(m, 0)).bit_count() >= 4]
+        if not usable:
+            break
+        question_metric = rng.choice(usable)
+
+        ranks = sorted(mask_ids(pool & snap.metric_masks[question_metric]),
+                       key=snap.metric_positions[question_metric].__getitem__)
+        picked = sample_by_rank(ranks, DIFFICULTY_WINDOWS[difficulty], rng=rng,
+                                values=[snap.countries[i][question_metric] for i in ranks])
+        if picked is None:
+            break
+        picked = [ranks[r] for r in picked]
+        pool &= ~to_mask(picked)
+        questions.append(make_question(question_metric, difficulty, [snap.countries[i] for i in picked],
+                                       rng, token_nonce))
+
+    return questions
+
+
+@flag_game_bp.route('/api/question')
+def get_question():
+    """Get a random comparison question.
+
+    Optional query parameters: metric (one of METRICS), difficulty
+    (easy, medium or hard), mode=lookalike for similar-looking flags,
+    seed + index for a reproducible question, and theme filters on
+    THEME_ATTRIBUTES (e.g. continent=Africa).
+    """
+    if len(snapshot.countries) < 4:
+        return jsonify({'error': 'Not enough countries loaded'}), 404
+
+    rng = seeding.request_rng('flag')
+    metric = request.args.get('metric')
+    difficulty = request.args.get('difficulty', 'easy')
+    lookalike = request.args.get('mode') == 'lookalike'
+
+    if metric is not None and metric not in METRICS:
+        return jsonify({'error': f'Unknown metric {metric}'}), 400
+    if difficulty not in DIFFICULTY_WINDOWS:
+        return jsonify({'error': f'Unknown difficulty {difficulty}'}), 400
+    if lookalike and not snapshot.lookalikes:
+        return jsonify({'error': 'Look-alike table missing (python -m tools.flag_neighbours)'}), 404
+
+    response = build_question(metric, difficulty, rng, request_theme(), lookalike)
+
+    if response is None:
+        return jsonify({'error': f'Not enough countries with {metric or "metric"} data for this theme'}), 404
+
+    # The answer and the option values come back from /api/verify
+    return seeding.make_cacheable(jsonify(hide_answer(response)), rng)
+
+
+@flag_game_bp.route('/api/themes')
+def get_themes():
+    """List theme attributes, their values and how many countries each has."""
     return jsonify({
-        'question': question_texts[metric],
-        'metric': metric,
-        'options': options,
-        'correct_answer': correct_country['name']
+        attribute: {value: mask.bit_count() for value, mask in sorted(values.items())}
+        for attribute, values in snapshot.theme_masks.items()
     })
 
 
+@flag_game_bp.route('/api/round')
+def get_round():
+    """Deal a whole game (?n=10, max 50) with no country repeated.
+
+    Accepts metric, difficulty, theme filters and seed + index like
+    /api/question.
+    """
+    n = min(max(request.args.get('n', 10, type=int), 1), 50)
+    metric = request.args.get('metric')
+    difficulty = request.args.get('difficulty', 'easy')
+
+    if metric is not None and metric not in METRICS:
+        return jsonify({'error': f'Unknown metric {metric}'}), 400
+    if difficulty not in DIFFICULTY_WINDOWS:
+        return jsonify({'error': f'Unknown difficulty {difficulty}'}), 400
+
+    rng = seeding.request_rng('flag:round')
+    questions = build_round(n, rng, request_theme(), metric, difficulty)
+
+    if not questions:
+        return jsonify({'error': 'Not enough countries for this theme'}), 404
+
+    return seeding.make_cacheable(jsonify({'questions': [hide_answer(q) for q in questions]}), rng)
+
+
+@flag_game_bp.route('/api/verify', methods=['POST'])
+def verify_answer():
+    """Check an answer against its question token."""
+    body, status = tokens.check_answer('flag', request.json)
+    if status == 200:
+        ratings.update(body['item'], body['correct'])
+        history.record_answer('flag', body['item'], body['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@flag_game_bp.route('/api/report-answer', methods=['POST'])
+def report_flag_answer():
+    """Report an answer ({item: iso2, correct}) to update the flag's rating."""
+    body, status = report_answer(ratings, request.json)
+    if status == 200:
+        history.record_answer('flag', body['item'], request.json['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@flag_game_bp.route('/api/ratings')
+def get_ratings():
+    """Get flags from hardest to easiest."""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'ratings': ratings.to_dict(limit)})
+
+
 # Load countries when module is imported
-load_countries()
\ No newline at end of file
+try:
+    load_countries()
+except Exception as e:
+    log.exception("Error loading %s: %s", CSV_PATH.name, e)
+reload.register('countries', load_countries, watch=[CSV_PATH, FLAGS_FOLDER, NEIGHBOURS_FILE])
+
+
+def load_flag_images(name='countries'):
+    """Put the flags in the in-memory asset store (again after a reload)."""
+    if name == 'countries' and asset_store.enabled:
+        log.info("%d flags held in memory", asset_store.load_folder('flags', FLAGS_FOLDER))
+
+
+load_flag_images()
+reload.on_reload(load_flag_images)
\ No newline at end of file
@@ -1,15 +1,22 @@
 
 """
 Pi Decimals Game - Ranked Mode
-Guess the next decimal of Pi
+Guess the next decimal of Pi, or recite as many as you can in one go
 """
 from datetime import datetime
+import logging
 
 from flask import Blueprint, render_template, jsonify, request
-import json
 from pathlib import Path
 import random
 
+from common import history, seeding, tokens
+from common.leaderboard import Leaderboard, WINDOWS
+from common.ratelimit import throttle_writes
+from common.rooms import RoomLeaderboards, request_room
+
+log = logging.getLogger(__name__)
+
 # Create blueprint
 pi_game_bp = Blueprint('pi_game', __name__,
                        template_folder='templates',
@@ -18,22 +25,45 @@ pi_game_bp = Blueprint('pi_game', __name__,
 # Pi decimals (first 1000 digits after the decimal point)
 PI_DECIMALS = "1415926535897932384626433832795028841971693993751058209749445923078164062862089986280348253421170679821480865132823066470938446095505822317253594081284811174502841027019385211055596446229489549303819644288109756659334461284756482337867831652712019091456485669234603486104543266482133936072602491412737245870066063155881748815209209628292540917153643678925903600113305305488204665213841469519415116094330572703657595919530921861173819326117931051185480744623799627495673518857527248912279381830119491298336733624406566430860213949463952247371907021798609437027705392171762931767523846748184676694051320005681271452635608277857713427577896091736371787214684409012249534301465495853710507922796892589235420199561121290219608640344181598136297747713099605187072113499999983729780499510597317328160963185950244594553469083026425223082533446850352619311881710100031378387528865875332083814206171776691473035982534904287554687311595628638823537875937519577818577805321712268066130019278766111959092164201989"
 
+# Longer digit store for the recitation mode, built by python -m tools.pi_digits
+PI_DIGITS_FILE = Path(__file__).parent / "data" / "pi_digits.txt"
+
 LEADERBOARD_FILE = Path(__file__).parent / "data" / "pi_leaderboard.json"
 LEADERBOARD_FILE.parent.mkdir(exist_ok=True)
 
 
-def load_leaderboard():
-    """Load leaderboard from file."""
-    if LEADERBOARD_FILE.exists():
-        with open(LEADERBOARD_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return []
+# Sorted best first: all-time top 100 plus per-day buckets for the windows
+leaderboard = Leaderboard(LEADERBOARD_FILE, sort_key=lambda x: -x['position'])
+
+# One leaderboard per room (?room=), only the recently used ones in memory
+rooms = RoomLeaderboards(leaderboard, LEADERBOARD_FILE.parent / "rooms", leaderboard.sort_key)
+
+
+def load_pi_digits():
+    """Decimals checked by the recitation mode, as ASCII bytes (PI_DECIMALS without the file)."""
+    if PI_DIGITS_FILE.exists():
+        digits = PI_DIGITS_FILE.read_bytes().strip()
+        if digits.startswith(PI_DECIMALS.encode('ascii')):
+            return digits
+        log.warning("%s doesn't match PI_DECIMALS, ignored", PI_DIGITS_FILE.name)
+    return PI_DECIMALS.encode('ascii')
 
 
-def save_leaderboard(leaderboard):
-    """Save leaderboard to file."""
-    with open(LEADERBOARD_FILE, 'w', encoding='utf-8') as f:
-        json.dump(leaderboard, f, indent=2, ensure_ascii=False)
+PI_DIGITS = load_pi_digits()
+
+
+def correct_prefix(typed):
+    """Number of leading digits of typed (ASCII bytes) that match Pi's decimals.
+
+    The typed digits and the same number of stored digits are read as two
+    big integers and XORed: the highest set bit falls in the first wrong
+    byte. No Python loop over the digits, so it runs at memory speed.
+    """
+    n = min(len(typed), len(PI_DIGITS))
+    diff = int.from_bytes(typed[:n], 'big') ^ int.from_bytes(PI_DIGITS[:n], 'big')
+    if diff == 0:
+        return n
+    return n - 1 - (diff.bit_length() - 1) // 8
 
 
 @pi_game_bp.route('/')
@@ -42,78 +72,162 @@ def index():
     return render_template('pi_game.html')
 
 
-@pi_game_bp.route('/api/question')
-def get_question():
-    """Get a question about the next Pi decimal."""
-    position = request.args.get('position', 0, type=int)
+def build_question(position, rng=None):
+    """Build the question about the decimal at position.
 
-    if position < 0 or position >= len(PI_DECIMALS):
-        return jsonify({'error': 'Invalid position'}), 400
+    rng is a seeded random.Random for reproducible options (defaults to the
+    shared random module).
+    """
+    token_nonce = seeding.nonce(rng)
+    rng = rng or random
 
     correct_digit = int(PI_DECIMALS[position])
 
     # Generate 3 wrong answers (different from correct)
     wrong_digits = [d for d in range(10) if d != correct_digit]
-    wrong_answers = random.sample(wrong_digits, 3)
+    wrong_answers = rng.sample(wrong_digits, 3)
 
     # Combine and shuffle
     options = [correct_digit] + wrong_answers
-    random.shuffle(options)
+    rng.shuffle(options)
 
     # Show previous digits for context (last 10)
     start = max(0, position - 10)
     previous_digits = PI_DECIMALS[start:position]
 
-    return jsonify({
+    return {
         'position': position,
         'previous_digits': previous_digits,
         'options': options,
-        'correct': correct_digit
+        'correct': correct_digit,
+        'token': tokens.question_token('pi', correct_digit, position, token_nonce)
+    }
+
+
+@pi_game_bp.route('/api/question')
+def get_question():
+    """Get a question about the next Pi decimal.
+
+    With seed + index the options are reproducible, and position defaults
+    to index (line index of the /api/questions/stream export).
+    """
+    rng = seeding.request_rng('pi')
+    default = request.args.get('index', 0, type=int) % len(PI_DECIMALS) if rng is not None else 0
+    position = request.args.get('position', default, type=int)
+
+    if position < 0 or position >= len(PI_DECIMALS):
+        return jsonify({'error': 'Invalid position'}), 400
+
+    response = build_question(position, rng)
+
+    # The answer comes back from /api/verify
+    del response['correct']
+
+    return seeding.make_cacheable(jsonify(response), rng)
+
+
+@pi_game_bp.route('/api/recite', methods=['POST'])
+def recite():
+    """Check a whole recitation ({digits: "14159..."}, spaces and a leading "3." allowed).
+
+    Returns the number of correct leading decimals and the position of the
+    first wrong one (None if all are right). No score token: a pasted run
+    can't be told from a recited one, so its score is submitted (and
+    shown) as unverified.
+    """
+    digits = ''.join(str((request.json or {}).get('digits', '')).split())
+    if digits[:2] in ('3.', '3,'):
+        digits = digits[2:]
+
+    if not digits or not (digits.isascii() and digits.isdigit()):
+        return jsonify({'error': 'digits must be a non-empty string of decimals'}), 400
+
+    typed = digits.encode('ascii')
+    checked = min(len(typed), len(PI_DIGITS))
+    correct = correct_prefix(typed)
+    error = correct if correct < checked else None
+
+    return jsonify({
+        'typed': len(typed),
+        'checked': checked,
+        'correct_digits': correct,
+        'first_error': error,
+        'expected': None if error is None else PI_DIGITS[error] - 48,
     })
 
 
+@pi_game_bp.route('/api/verify', methods=['POST'])
+def verify_answer():
+    """Check a digit against its question token."""
+    body, status = tokens.check_answer('pi', request.json)
+    if status == 200:
+        history.record_answer('pi', body['item'], body['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
 @pi_game_bp.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
-    """Get top 20 scores."""
-    leaderboard = load_leaderboard()
-    leaderboard.sort(key=lambda x: (-x['position']))
-    return jsonify({'leaderboard': leaderboard[:20]})
+    """Get top 20 scores of a window (?window=day, week or all) and room (?room=)."""
+    window = request.args.get('window', 'all')
+    if window not in WINDOWS:
+        return jsonify({'error': f'Unknown window {window}'}), 400
+
+    room = request_room()
+    board = rooms.get(room)
+    if board is None:
+        return jsonify({'error': f'Invalid room {room}'}), 400
+    return jsonify({'window': window, 'room': room or None, 'leaderboard': board.top(window, 20)})
 
 
 @pi_game_bp.route('/api/submit-score', methods=['POST'])
+@throttle_writes()
 def submit_score():
-    """Submit a new score."""
-    data = request.json
+    """Submit a new score (to a room's leaderboard with "room")."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+
+    room = request_room()
+    board = rooms.get(room)
+    if board is None:
+        return jsonify({'error': f'Invalid room {room}'}), 400
+
+    # A signed score token (from /api/verify) replaces the client's position
+    if data.get('score_token'):
+        trusted = tokens.trusted_score('pi', data['score_token'])
+        if trusted is None:
+            return jsonify({'error': 'Invalid score token'}), 400
+        data['position'] = trusted[0]
 
     # Validate data
     if not data.get('name') or data.get('position') is None:
         return jsonify({'error': 'Missing required fields'}), 400
 
-    leaderboard = load_leaderboard()
-
     # Add new entry
-    entry = {
-        'name': data['name'][:20],
-        'position': int(data['position']),
-        'date': datetime.now().isoformat()
-    }
-
-    leaderboard.append(entry)
-
-    # Keep only top 100
-    leaderboard.sort(key=lambda x: -x['position'])
-    leaderboard = leaderboard[:100]
+    try:
+        entry = {
+            'name': str(data['name'])[:20],
+            'position': int(data['position']),
+            'date': datetime.now().isoformat(),
+            'verified': bool(data.get('score_token'))
+        }
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Invalid position'}), 400
 
-    save_leaderboard(leaderboard)
+    # Only now may a new room claim one of the ROOM_FILES slots
+    if not rooms.reserve(room):
+        return jsonify({'error': 'Too many rooms, pick an existing one'}), 403
 
-    # Return rank
-    rank = next((i + 1 for i, e in enumerate(leaderboard) if e == entry), None)
+    # Keeps the top 100, plus today's and this week's buckets
+    rank = board.add(entry)
+    history.record_game('pi', entry['position'], entry['name'])
 
     return jsonify({
         'success': True,
         'rank': rank,
-        'total': len(leaderboard)
+        'room': room or None,
+        'total': len(board)
     })
 
 
-print(f"✓ Pi Game loaded with {len(PI_DECIMALS)} decimals\n")
\ No newline at end of file
+log.info("Pi Game loaded with %d decimals (%d for recitation)", len(PI_DECIMALS), len(PI_DIGITS))
\ No newline at end of file
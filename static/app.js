@@ -15,9 +15,14 @@ let isOffline = !navigator.onLine;
 let gameData = {
     countries: [],
     players: [],
-    quizData: null
+    quizData: null,
+    piQuestions: null
 };
 
+// Leaderboard room shared by a family or a class (/?room=famille-martin)
+const ROOM = new URLSearchParams(window.location.search).get('room') || '';
+const roomQuery = ROOM ? `?room=${encodeURIComponent(ROOM)}` : '';
+
 // ===== OFFLINE DETECTION =====
 window.addEventListener('online', () => {
     isOffline = false;
@@ -113,8 +118,47 @@ async function loadAllGameData() {
         console.warn('⚠️ Failed to load quiz data:', e);
     }
 
+    try {
+        // Pi questions pack (only in the static export, line i = position i)
+        const piRes = await fetch('/packs/pi.ndjson');
+        if (piRes.ok) {
+            const text = await piRes.text();
+            gameData.piQuestions = text.trim().split('\n').map(line => JSON.parse(line));
+            console.log('✓ Loaded', gameData.piQuestions.length, 'pi questions');
+        }
+    } catch (e) {
+        console.warn('⚠️ Failed to load pi questions:', e);
+    }
+
     console.log('✅ All game data loaded');
 }
+
+// ===== SERVER-CHECKED ANSWERS =====
+// Online questions carry a sealed token instead of their answer: /api/verify
+// returns the answer and the next score token, which the leaderboard takes
+// as a verified score. Each score token can be used only once.
+async function verifyAnswer(game, question, answer, scoreToken) {
+    const response = await fetch(`/${game}/api/verify`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ token: question.token, answer: answer, score_token: scoreToken })
+    });
+    const data = await response.json();
+    if (!response.ok) {
+        throw new Error(data.error || `HTTP ${response.status}`);
+    }
+    return data;
+}
+
+async function fetchQuestion(url) {
+    try {
+        const response = await fetch(url);
+        return response.ok ? await response.json() : null;
+    } catch (e) {
+        console.warn('⚠️ Failed to load question:', e);
+        return null;
+    }
+}
 // ===== FLAG GAME =====
 const flagGame = {
     initialized: false,
@@ -124,6 +168,9 @@ const flagGame = {
     questionNum: 0,
     currentCorrectAnswer: '',
     currentMetric: '',
+    currentQuestion: null,
+    scoreToken: null,
+    answering: false,
     maxQuestions: 10,
     rankedMode: false,
     startTime: null,
@@ -141,6 +188,7 @@ const flagGame = {
         this.bestStreak = 0;
         this.questionNum = 0;
         this.rankedMode = ranked;
+        this.scoreToken = null;
         this.startTime = ranked ? Date.now() : null;
         this.endTime = null;
 
@@ -247,7 +295,7 @@ const flagGame = {
         return num.toLocaleString();
     },
 
-    loadQuestion() {
+    async loadQuestion() {
         console.log('🎯 Flag game - loading question');
         console.log('🎯 Countries available:', gameData.countries.length);
 
@@ -257,7 +305,10 @@ const flagGame = {
             existingFlag.remove();
         }
 
-        const questionData = this.generateQuestion();
+        // Ranked games are dealt and checked by the server
+        const questionData = (this.rankedMode && !isOffline)
+            ? await fetchQuestion('/flag-game/api/question')
+            : this.generateQuestion();
         console.log('🎯 Generated question:', questionData);
 
         if (!questionData) {
@@ -265,8 +316,10 @@ const flagGame = {
             return;
         }
 
+        this.currentQuestion = questionData;
         this.currentCorrectAnswer = questionData.correct_answer;
         this.currentMetric = questionData.metric;
+        this.answering = false;
 
         document.getElementById('flag-question').textContent = questionData.question;
 
@@ -319,7 +372,25 @@ const flagGame = {
         console.log('✅ Flag question displayed');
     },
 
-    checkAnswer(selectedAnswer, selectedCard) {
+    async checkAnswer(selectedAnswer, selectedCard) {
+        if (this.answering) return;
+        this.answering = true;
+
+        let values = null;
+        if (this.currentQuestion.token) {
+            try {
+                const result = await verifyAnswer('flag-game', this.currentQuestion, selectedAnswer, this.scoreToken);
+                this.scoreToken = result.score_token;
+                this.currentCorrectAnswer = result.correct_answer;
+                values = result.reveal;
+            } catch (error) {
+                console.error('Error verifying answer:', error);
+                alert('Erreur lors de la vérification de la réponse');
+                this.answering = false;
+                return;
+            }
+        }
+
         const isCorrect = selectedAnswer === this.currentCorrectAnswer;
 
         const cards = document.querySelectorAll('#flag-options .option-card');
@@ -334,7 +405,7 @@ const flagGame = {
             if (this.currentMetric !== 'flag_guess') {
                 const valueDiv = card.querySelector('.country-value');
                 if (valueDiv) {
-                    const value = parseInt(valueDiv.dataset.value);
+                    const value = values ? values[countryName] : parseInt(valueDiv.dataset.value);
                     valueDiv.textContent = this.formatNumber(value, this.currentMetric);
                     valueDiv.classList.add('revealed');
                 }
@@ -453,13 +524,14 @@ const flagGame = {
         });
 
         try {
-            const response = await fetch('/flag-game/api/submit-score', {
+            const response = await fetch(`/flag-game/api/submit-score${roomQuery}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     name: name,
                     score: this.score / 10,  // Score sur 10
-                    time: timeInSeconds
+                    time: timeInSeconds,
+                    score_token: this.scoreToken  // verified score when the server checked the answers
                 })
             });
 
@@ -482,7 +554,7 @@ const flagGame = {
 
     async showLeaderboard() {
         try {
-            const response = await fetch('/flag-game/api/leaderboard');
+            const response = await fetch(`/flag-game/api/leaderboard${roomQuery}`);
             const data = await response.json();
 
             const leaderboardDiv = document.getElementById('flag-leaderboard');
@@ -527,6 +599,7 @@ const toulouseGame = {
     currentQuestion: null,
     selectedName: null,
     selectedPosition: null,
+    scoreToken: null,
     maxQuestions: 10,
 
     async init() {
@@ -539,6 +612,7 @@ const toulouseGame = {
         this.questionNum = 0;
         this.selectedName = null;
         this.selectedPosition = null;
+        this.scoreToken = null;
 
         document.getElementById('toulouse-score').textContent = this.score;
         document.getElementById('toulouse-question-num').textContent = 1;
@@ -548,40 +622,25 @@ const toulouseGame = {
 
         this.loadQuestion();
     },
+    // Offline question (position only): online ones come from the server
     generateQuestion() {
         if (gameData.players.length === 0) return null;
 
         const correctPlayer = gameData.players[Math.floor(Math.random() * gameData.players.length)];
-
-        if (isOffline) {
-            const wrongPositions = gameData.positions.filter(p => p !== correctPlayer.position);
-            const shuffledWrong = wrongPositions.sort(() => Math.random() - 0.5).slice(0, 3);
-            const positionOptions = [correctPlayer.position, ...shuffledWrong].sort(() => Math.random() - 0.5);
-
-            return {
-                player: correctPlayer,
-                position_options: positionOptions,
-                offline_mode: true
-            };
-        }
-
-        const otherPlayers = gameData.players.filter(p => p.name !== correctPlayer.name);
-        const wrongNames = otherPlayers.sort(() => Math.random() - 0.5).slice(0, 3);
-        const nameOptions = [correctPlayer.name, ...wrongNames.map(p => p.name)].sort(() => Math.random() - 0.5);
-
         const wrongPositions = gameData.positions.filter(p => p !== correctPlayer.position);
-        const positionOptions = [correctPlayer.position, ...wrongPositions.sort(() => Math.random() - 0.5).slice(0, 3)].sort(() => Math.random() - 0.5);
+        const shuffledWrong = wrongPositions.sort(() => Math.random() - 0.5).slice(0, 3);
+        const positionOptions = [correctPlayer.position, ...shuffledWrong].sort(() => Math.random() - 0.5);
 
         return {
             player: correctPlayer,
-            name_options: nameOptions,
             position_options: positionOptions,
-            offline_mode: false
+            offline_mode: true
         };
     },
 
-    loadQuestion() {
-        this.currentQuestion = this.generateQuestion();
+    async loadQuestion() {
+        this.currentQuestion = (isOffline ? null : await fetchQuestion('/toulouse-game/api/question'))
+            || this.generateQuestion();
         if (!this.currentQuestion) {
             alert('Erreur: Pas assez de données');
             return;
@@ -614,7 +673,7 @@ const toulouseGame = {
             nameSection.style.display = 'block';
 
             const img = document.getElementById('toulouse-player-img');
-            img.src = `/toulouse-game/players/${this.currentQuestion.player.image_path}`;
+            img.src = `/toulouse-game/photos/${this.currentQuestion.image}`;
             img.onerror = () => {
                 playerImageDiv.style.display = 'none';
             };
@@ -674,12 +733,11 @@ const toulouseGame = {
         this.checkAnswer();
     },
 
-    checkAnswer() {
+    async checkAnswer() {
         console.log('🔍 checkAnswer called');
         console.log('🔍 offline_mode:', this.currentQuestion.offline_mode);
         console.log('🔍 selectedPosition:', this.selectedPosition);
         console.log('🔍 selectedName:', this.selectedName);
-        console.log('🔍 correct position:', this.currentQuestion.player.position);
 
         // OFFLINE MODE - Only position question
         if (this.currentQuestion.offline_mode) {
@@ -715,11 +773,23 @@ const toulouseGame = {
         // ONLINE MODE - Name AND position questions
         if (this.selectedName === null || this.selectedPosition === null) return;
 
-        const nameCorrect = this.selectedName === this.currentQuestion.player.name;
-        const positionCorrect = this.selectedPosition === this.currentQuestion.player.position;
+        let expected;
+        try {
+            const answer = { name: this.selectedName, position: this.selectedPosition };
+            const result = await verifyAnswer('toulouse-game', this.currentQuestion, answer, this.scoreToken);
+            this.scoreToken = result.score_token;
+            expected = result.correct_answer;
+        } catch (error) {
+            console.error('Error verifying answer:', error);
+            alert('Erreur lors de la vérification de la réponse');
+            return;
+        }
+
+        const nameCorrect = this.selectedName === expected.name;
+        const positionCorrect = this.selectedPosition === expected.position;
 
         document.querySelectorAll('#toulouse-name-options .option-btn').forEach(b => {
-            if (b.textContent === this.currentQuestion.player.name) {
+            if (b.textContent === expected.name) {
                 b.classList.add('correct');
             } else if (b.textContent === this.selectedName && !nameCorrect) {
                 b.classList.add('wrong');
@@ -727,7 +797,7 @@ const toulouseGame = {
         });
 
         document.querySelectorAll('#toulouse-position-options .option-btn').forEach(b => {
-            if (b.textContent === this.currentQuestion.player.position) {
+            if (b.textContent === expected.position) {
                 b.classList.add('correct');
             } else if (b.textContent === this.selectedPosition && !positionCorrect) {
                 b.classList.add('wrong');
@@ -738,16 +808,16 @@ const toulouseGame = {
         if (nameCorrect && positionCorrect) {
             this.score++;
             document.getElementById('toulouse-score').textContent = this.score;
-            resultDiv.textContent = `✅ Bravo ! C'est bien ${this.currentQuestion.player.name}, ${this.currentQuestion.player.position} !`;
+            resultDiv.textContent = `✅ Bravo ! C'est bien ${expected.name}, ${expected.position} !`;
             resultDiv.className = 'result correct';
         } else if (nameCorrect) {
-            resultDiv.textContent = `⚠️ Bon nom, mais c'est un ${this.currentQuestion.player.position}`;
+            resultDiv.textContent = `⚠️ Bon nom, mais c'est un ${expected.position}`;
             resultDiv.className = 'result wrong';
         } else if (positionCorrect) {
-            resultDiv.textContent = `⚠️ Bon poste, mais c'est ${this.currentQuestion.player.name}`;
+            resultDiv.textContent = `⚠️ Bon poste, mais c'est ${expected.name}`;
             resultDiv.className = 'result wrong';
         } else {
-            resultDiv.textContent = `❌ C'est ${this.currentQuestion.player.name}, ${this.currentQuestion.player.position}`;
+            resultDiv.textContent = `❌ C'est ${expected.name}, ${expected.position}`;
             resultDiv.className = 'result wrong';
         }
 
@@ -784,6 +854,7 @@ const quizGame = {
     score: 0,
     questionNum: 0,
     currentQuestion: null,
+    scoreToken: null,
     maxQuestions: 10,
 
     async init() {
@@ -795,6 +866,7 @@ const quizGame = {
         console.log('🔄 Restarting quiz...');
         this.score = 0;
         this.questionNum = 0;
+        this.scoreToken = null;
 
         document.getElementById('quiz-score').textContent = this.score;
         document.getElementById('quiz-question-num').textContent = 1;
@@ -821,30 +893,11 @@ const quizGame = {
         document.getElementById('quiz-loading').classList.remove('hidden');
         document.getElementById('quiz-game-content').classList.add('hidden');
 
-        let data;
-
-        // Use cached data if available
-        if (gameData.quizData && gameData.quizData.questions && gameData.quizData.questions.length > 0) {
+        // Online questions are checked by the server, the cached pack is the offline fallback
+        let data = isOffline ? null : await fetchQuestion('/top14-quiz/api/question');
+        if (!data) {
             console.log('📦 Using cached quiz data');
             data = this.generateQuestion();
-        } else {
-        console.log('⚠️ No cached data, trying to fetch...');
-        // ... rest of code else {
-            // Fallback: try to fetch if cache is empty
-            try {
-                const response = await fetch('/top14-quiz/api/question');
-
-                // Check if response is ok before parsing JSON
-                if (!response.ok) {
-                    throw new Error('Network response was not ok');
-                }
-
-                data = await response.json();
-            } catch (error) {
-                console.error('❌ Error loading question:', error);
-                document.getElementById('quiz-loading').textContent = 'Erreur: Pas de données disponibles. Connectez-vous à internet.';
-                return;
-            }
         }
 
         if (!data) {
@@ -877,12 +930,26 @@ const quizGame = {
         console.log('✅ Quiz question displayed');
     },
 
-    checkAnswer(selected, btn) {
-        const isCorrect = selected === this.currentQuestion.correct;
+    async checkAnswer(selected, btn) {
+        document.querySelectorAll('#quiz-options .option-btn').forEach(b => b.disabled = true);
+
+        let correct = this.currentQuestion.correct;
+        if (this.currentQuestion.token) {
+            try {
+                const result = await verifyAnswer('top14-quiz', this.currentQuestion, selected, this.scoreToken);
+                this.scoreToken = result.score_token;
+                correct = result.correct_answer;
+            } catch (error) {
+                console.error('Error verifying answer:', error);
+                alert('Erreur lors de la vérification de la réponse');
+                document.querySelectorAll('#quiz-options .option-btn').forEach(b => b.disabled = false);
+                return;
+            }
+        }
+        const isCorrect = selected === correct;
 
         document.querySelectorAll('#quiz-options .option-btn').forEach(b => {
-            b.disabled = true;
-            if (b.textContent === this.currentQuestion.correct) {
+            if (b.textContent === correct) {
                 b.classList.add('correct');
             } else if (b === btn && !isCorrect) {
                 b.classList.add('wrong');
@@ -896,7 +963,7 @@ const quizGame = {
             resultDiv.textContent = '✅ Bravo ! Bonne réponse !';
             resultDiv.className = 'result correct';
         } else {
-            resultDiv.textContent = `❌ Faux ! La bonne réponse était : ${this.currentQuestion.correct}`;
+            resultDiv.textContent = `❌ Faux ! La bonne réponse était : ${correct}`;
             resultDiv.className = 'result wrong';
         }
 
@@ -946,6 +1013,7 @@ const piGame = {
     initialized: false,
     currentPosition: 0,
     currentQuestion: null,
+    scoreToken: null,
 
     async init() {
         this.initialized = true;
@@ -954,6 +1022,7 @@ const piGame = {
 
     restart() {
         this.currentPosition = 0;
+        this.scoreToken = null;
 
         document.getElementById('pi-game-content').classList.remove('hidden');
         document.getElementById('pi-game-over').classList.add('hidden');
@@ -963,8 +1032,11 @@ const piGame = {
 
     async loadQuestion() {
         try {
-            const response = await fetch(`/pi-game/api/question?position=${this.currentPosition}`);
-            const data = await response.json();
+            // Online questions are checked by the server, the pack is the offline fallback
+            let data = isOffline ? null : await fetchQuestion(`/pi-game/api/question?position=${this.currentPosition}`);
+            if (!data) {
+                data = gameData.piQuestions && gameData.piQuestions[this.currentPosition];
+            }
 
             this.currentQuestion = data;
 
@@ -1005,13 +1077,27 @@ const piGame = {
             console.error('Error loading question:', error);
         }
     },
-    checkAnswer(selected, btn) {
-        const isCorrect = selected === this.currentQuestion.correct;
-
+    async checkAnswer(selected, btn) {
         // Disable all buttons
+        document.querySelectorAll('#pi-options .option-btn').forEach(b => b.disabled = true);
+
+        let correct = this.currentQuestion.correct;
+        if (this.currentQuestion.token) {
+            try {
+                const result = await verifyAnswer('pi-game', this.currentQuestion, selected, this.scoreToken);
+                this.scoreToken = result.score_token;
+                correct = result.correct_answer;
+            } catch (error) {
+                console.error('Error verifying answer:', error);
+                alert('Erreur lors de la vérification de la réponse');
+                document.querySelectorAll('#pi-options .option-btn').forEach(b => b.disabled = false);
+                return;
+            }
+        }
+        const isCorrect = selected === correct;
+
         document.querySelectorAll('#pi-options .option-btn').forEach(b => {
-            b.disabled = true;
-            if (parseInt(b.textContent) === this.currentQuestion.correct) {
+            if (parseInt(b.textContent) === correct) {
                 b.classList.add('correct');
             } else if (b === btn && !isCorrect) {
                 b.classList.add('wrong');
@@ -1033,7 +1119,7 @@ const piGame = {
                 setTimeout(() => this.loadQuestion(), 1000);
             }
         } else {
-            resultDiv.textContent = `❌ Faux ! C'était ${this.currentQuestion.correct}`;
+            resultDiv.textContent = `❌ Faux ! C'était ${correct}`;
             resultDiv.className = 'result wrong';
 
             setTimeout(() => this.gameOver(), 1000);
@@ -1059,12 +1145,13 @@ const piGame = {
         }
 
         try {
-            const response = await fetch('/pi-game/api/submit-score', {
+            const response = await fetch(`/pi-game/api/submit-score${roomQuery}`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     name: name,
                     position: this.currentPosition,
+                    score_token: this.scoreToken  // verified position when the server checked the answers
                 })
             });
 
@@ -1083,7 +1170,7 @@ const piGame = {
 
     async showLeaderboard() {
         try {
-            const response = await fetch('/pi-game/api/leaderboard');
+            const response = await fetch(`/pi-game/api/leaderboard${roomQuery}`);
             const data = await response.json();
 
             const leaderboardDiv = document.getElementById('pi-leaderboard');
@@ -3,7 +3,7 @@
  * Caches all assets and provides offline functionality
  */
 
-const CACHE_NAME = 'lea-constant-games-v20';
+const CACHE_NAME = 'lea-constant-games-v21';
 const ASSETS_TO_CACHE = [
     '/',
     '/static/app.js',
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Flag duel load test
+Runs the app in-process and opens SSE streams for more and more rooms to
+see how many concurrent duels one process holds.
+
+Usage: python -m tools.duel_load_test [--rooms 50 100 200] [--players 2]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import resource
+import selectors
+import socket
+import statistics
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from app import app
+from flag_game import duel
+
+
+def post(port, path, data=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', path, body=json.dumps(data or {}), headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    body = json.loads(response.read())
+    conn.close()
+    return body
+
+
+def open_stream(port, room_id):
+    """Open a raw SSE connection (non-blocking socket)."""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.sendall(f"GET /flag-game/duel/rooms/{room_id}/events HTTP/1.1\r\n"
+                 f"Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode())
+    sock.setblocking(False)
+    return sock
+
+
+def run_level(port, n_rooms, n_players):
+    """Hold n_rooms duels open and time the first question fan-out."""
+    selector = selectors.DefaultSelector()
+    received = {}
+    started = {}
+    done = threading.Event()
+
+    room_ids = {}  # room id -> token of its first player (starts it)
+    for _ in range(n_rooms):
+        room_id = post(port, '/flag-game/duel/rooms', {'n': 3})['room']
+        for p in range(n_players):
+            token = post(port, f'/flag-game/duel/rooms/{room_id}/join', {'name': f'p{p}'})['token']
+            room_ids.setdefault(room_id, token)
+            sock = open_stream(port, room_id)
+            selector.register(sock, selectors.EVENT_READ, (room_id, p))
+
+    def read_loop():
+        while not done.is_set():
+            for key, _ in selector.select(timeout=0.1):
+                try:
+                    chunk = key.fileobj.recv(65536)
+                except BlockingIOError:
+                    continue
+                if b'event: question' in chunk and key.data not in received:
+                    received[key.data] = time.perf_counter() - started[key.data[0]]
+
+    reader = threading.Thread(target=read_loop, daemon=True)
+    reader.start()
+    time.sleep(0.5)  # let every stream attach
+
+    for room_id, token in room_ids.items():
+        started[room_id] = time.perf_counter()
+        post(port, f'/flag-game/duel/rooms/{room_id}/start', {'token': token})
+
+    deadline = time.time() + 30
+    while len(received) < n_rooms * n_players and time.time() < deadline:
+        time.sleep(0.05)
+
+    threads = threading.active_count()
+    done.set()
+    reader.join()
+    for key in list(selector.get_map().values()):
+        key.fileobj.close()
+    selector.close()
+
+    latencies = sorted(received.values()) or [float('nan')]
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) > 1 else latencies[0]
+    return {
+        'streams': n_rooms * n_players,
+        'delivered': len(received),
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': p95 * 1000,
+        'threads': threads,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flag duel SSE load test")
+    parser.add_argument('--rooms', type=int, nargs='+', default=[25, 50, 100, 200])
+    parser.add_argument('--players', type=int, default=2)
+    args = parser.parse_args()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    # Every room comes from this one client: lift the room creation limit
+    duel.room_limiter.rate = duel.room_limiter.burst = 1e9
+    threading.stack_size(512 * 1024)  # one server thread per open stream
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"\n{'Rooms':>6} {'Streams':>8} {'Delivered':>10} {'p50 ms':>8} {'p95 ms':>8} {'Threads':>8} {'RSS MB':>8}")
+    for n_rooms in args.rooms:
+        r = run_level(server.port, n_rooms, args.players)
+        print(f"{n_rooms:>6} {r['streams']:>8} {r['delivered']:>10} {r['p50_ms']:>8.1f} "
+              f"{r['p95_ms']:>8.1f} {r['threads']:>8} {r['max_rss_mb']:>8.1f}")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Static site export
+Write the whole single page app (pages, JSON data, question packs, images) to a folder
+
+Any static file server can then host it: no Python runs at serving time.
+
+Usage: python -m tools.export_static [--out build/site] [--questions 500] [--seed export]
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT = ROOT / "build" / "site"
+MANIFEST_FILENAME = "asset-manifest.json"
+
+# GET routes pre-rendered to files (route, query string); "/" becomes index.html
+PAGES = [
+    ('/', ''),
+    ('/manifest.json', ''),
+    ('/flag-game/api/all-countries', ''),
+    ('/flag-game/api/themes', ''),
+    ('/flag-game/api/leaderboard', ''),
+    ('/toulouse-game/api/all-players', ''),
+    ('/toulouse-game/api/stats', ''),
+    ('/top14-quiz/api/all-questions', 'seed={seed}&index=0'),
+    ('/top14-quiz/api/all-data', ''),
+    ('/pi-game/api/leaderboard', ''),
+]
+
+# Asset trees copied as they are (URL prefix -> source folder). Toulouse
+# player photos stay out: their file names give the answer away, the server
+# only serves them under opaque ids and the offline game shows none.
+ASSET_TREES = {
+    'static': ROOT / "static",
+    'flag-game/flags': ROOT / "flag_game" / "flags",
+}
+
+
+def prepare_output(out):
+    """Empty a previous export, refuse to write into any other non-empty folder."""
+    if out.exists() and any(out.iterdir()):
+        if not (out / MANIFEST_FILENAME).exists():
+            raise SystemExit(f"{out} is not empty and is not a previous export")
+        shutil.rmtree(out)
+    out.mkdir(parents=True)
+
+
+def render_pages(client, out, seed):
+    """Fetch each page through the app and write its body."""
+    for route, query in PAGES:
+        response = client.get(route, query_string=query.format(seed=seed))
+        if response.status_code != 200:
+            print(f"  ⚠️  {route}: HTTP {response.status_code}, skipped")
+            continue
+        target = out / (route.strip('/') or 'index.html')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(response.get_data())
+
+
+def write_packs(out, questions, seed):
+    """Pre-generate seeded question packs, one NDJSON file per game.
+
+    Line i is the question /api/question?seed=&index=i returns. The pi pack
+    has one line per decimal, so line i is the question for position i.
+    """
+    from app import QUESTION_BUILDERS, PI_DECIMALS, question_lines
+
+    packs = out / "packs"
+    packs.mkdir()
+    for game in QUESTION_BUILDERS:
+        n = len(PI_DECIMALS) if game == 'pi' else questions
+        with open(packs / f"{game}.ndjson", 'w', encoding='utf-8') as f:
+            f.writelines(question_lines(game, n, seed))
+
+
+def copy_assets(out):
+    """Copy every asset tree under its URL prefix."""
+    for prefix, folder in ASSET_TREES.items():
+        if folder.exists():
+            shutil.copytree(folder, out / prefix, ignore=shutil.ignore_patterns('service-worker*.js'))
+
+
+def site_files(out):
+    """URL path -> file of everything exported, sorted."""
+    files = {}
+    for path in sorted(out.rglob('*')):
+        if path.is_file():
+            url = '/' + path.relative_to(out).as_posix()
+            files['/' if url == '/index.html' else url] = path
+    return files
+
+
+def write_service_worker(out, files):
+    """Write the asset manifest and a service worker precaching exactly those files.
+
+    The cache name carries a hash of the content, so a new export replaces
+    the old cache on the next visit.
+    """
+    digests = {url: hashlib.sha256(path.read_bytes()).hexdigest()[:16] for url, path in files.items()}
+    version = hashlib.sha256(json.dumps(digests, sort_keys=True).encode()).hexdigest()[:12]
+
+    with open(out / MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump({'version': version, 'files': digests}, f, indent=1)
+
+    worker = (ROOT / "static" / "service-worker.js").read_text(encoding='utf-8')
+    worker = re.sub(r"const CACHE_NAME = '[^']*';",
+                    f"const CACHE_NAME = 'lea-constant-games-{version}';", worker, count=1)
+    worker = re.sub(r"const ASSETS_TO_CACHE = \[.*?\];",
+                    "const ASSETS_TO_CACHE = " + json.dumps(list(files), indent=4) + ";",
+                    worker, count=1, flags=re.DOTALL)
+    (out / "service-worker.js").write_text(worker, encoding='utf-8')
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUT, help="export folder")
+    parser.add_argument('--questions', type=int, default=500, help="questions per pack")
+    parser.add_argument('--seed', default='export', help="seed of the question packs")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    from app import app
+
+    out = args.out.resolve()
+    prepare_output(out)
+    render_pages(app.test_client(), out, args.seed)
+    write_packs(out, args.questions, args.seed)
+    copy_assets(out)
+
+    files = site_files(out)
+    version = write_service_worker(out, files)
+
+    size = sum(path.stat().st_size for path in files.values())
+    print(f"✓ Exported {len(files)} files ({size / 1e6:.1f} MB, version {version}) "
+          f"in {time.perf_counter() - start:.1f}s -> {out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Look-alike flags build step
+Compute colour and layout features of every flag and its nearest neighbours
+
+Usage: python -m tools.flag_neighbours [--k 16] [--out flag_game/data/flag_neighbours.json]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+FLAGS_FOLDER = ROOT / "flag_game" / "flags"
+DEFAULT_OUT = ROOT / "flag_game" / "data" / "flag_neighbours.json"
+
+# Every flag is boxed down to the same thumbnail (4:3 like the source PNGs)
+THUMB_SIZE = (32, 24)
+# Layout: mean colour of each cell of a GRID_ROWS x GRID_COLS grid
+GRID_ROWS, GRID_COLS = 6, 8
+# Colour: histogram with HIST_LEVELS levels per channel
+HIST_LEVELS = 4
+# Relative weight of the histogram against the layout grid
+HIST_WEIGHT = 0.5
+
+
+def thumbnail(path):
+    """Flag as an RGB thumbnail, transparent parts on white."""
+    image = Image.open(path).convert('RGBA').resize(THUMB_SIZE, Image.BOX)
+    background = Image.new('RGBA', THUMB_SIZE, (255, 255, 255, 255))
+    return np.asarray(Image.alpha_composite(background, image).convert('RGB'))
+
+
+def load_thumbnails(paths):
+    """Stack the flags as one (N, H, W, 3) float array in [0, 1]."""
+    thumbs = [thumbnail(path) for path in paths]
+    return np.stack(thumbs).astype(np.float32) / 255
+
+
+def layout_features(pixels):
+    """Mean colour per grid cell, flattened: (N, GRID_ROWS * GRID_COLS * 3)."""
+    n, h, w, c = pixels.shape
+    cells = pixels.reshape(n, GRID_ROWS, h // GRID_ROWS, GRID_COLS, w // GRID_COLS, c)
+    return cells.mean(axis=(2, 4)).reshape(n, -1)
+
+
+def colour_features(pixels):
+    """Share of pixels in each colour bin: (N, HIST_LEVELS ** 3)."""
+    n = len(pixels)
+    bins = HIST_LEVELS ** 3
+    levels = np.minimum((pixels * HIST_LEVELS).astype(np.int64), HIST_LEVELS - 1)
+    codes = (levels[..., 0] * HIST_LEVELS + levels[..., 1]) * HIST_LEVELS + levels[..., 2]
+
+    # One bincount for every flag at once: flag i counts in bins [i*bins, (i+1)*bins)
+    codes = codes.reshape(n, -1) + (np.arange(n) * bins)[:, None]
+    counts = np.bincount(codes.ravel(), minlength=n * bins).reshape(n, bins)
+    return counts / codes.shape[1]
+
+
+def feature_vectors(pixels):
+    """Layout and colour features side by side, each part scaled to unit norm on average."""
+    layout = layout_features(pixels)
+    colour = colour_features(pixels)
+    layout /= np.sqrt((layout ** 2).sum(axis=1).mean())
+    colour /= np.sqrt((colour ** 2).sum(axis=1).mean())
+    return np.hstack([layout, HIST_WEIGHT * colour]).astype(np.float32)
+
+
+def nearest_neighbours(features, k):
+    """Indices of the k closest flags of each flag, closest first: (N, k)."""
+    # Squared euclidean distances for all pairs: |a|² + |b|² - 2 a.b
+    norms = (features ** 2).sum(axis=1)
+    distances = norms[:, None] + norms[None, :] - 2 * features @ features.T
+    np.fill_diagonal(distances, np.inf)
+
+    nearest = np.argpartition(distances, k, axis=1)[:, :k]
+    order = np.take_along_axis(distances, nearest, axis=1).argsort(axis=1)
+    return np.take_along_axis(nearest, order, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--k', type=int, default=16, help="neighbours kept per flag")
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUT, help="JSON table to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = sorted(FLAGS_FOLDER.glob('*.png'))
+    codes = [path.stem.lower() for path in paths]
+    k = min(args.k, len(paths) - 1)
+
+    features = feature_vectors(load_thumbnails(paths))
+    nearest = nearest_neighbours(features, k)
+
+    table = {
+        'k': k,
+        'features': features.shape[1],
+        'neighbours': {code: [codes[j] for j in row] for code, row in zip(codes, nearest)}
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(table, f, separators=(',', ':'))
+
+    print(f"✓ {len(paths)} flags, {features.shape[1]} features, {k} neighbours each "
+          f"in {time.perf_counter() - start:.2f}s -> {args.out}")
+    for code in ('td', 'id', 'nl', 'ie'):
+        if code in table['neighbours']:
+            print(f"  - {code}: {' '.join(table['neighbours'][code][:5])}")
+
+
+if __name__ == '__main__':
+    main()
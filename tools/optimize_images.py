@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Image optimization build step
+Recompress flags, player photos and static images (lossless PNG + WebP)
+
+Usage: python -m tools.optimize_images [--out build/images] [--workers N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT = ROOT / "build" / "images"
+
+# Asset trees to optimize (name -> source folder)
+ASSET_TREES = {
+    'flags': ROOT / "flag_game" / "flags",
+    'players': ROOT / "toulouse_game" / "stats" / "joueur_stade_toulousain",
+    'static': ROOT / "static",
+}
+
+IMAGE_SUFFIXES = {'.png', '.jpg', '.jpeg'}
+CACHE_FILENAME = ".cache.json"
+
+
+def file_hash(path):
+    """SHA-256 of a file's content."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def optimize_one(src, png_out, webp_out):
+    """Write a lossless optimized PNG and a lossless WebP for one image.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    png_out.parent.mkdir(parents=True, exist_ok=True)
+    with Image.open(src) as img:
+        img.load()
+        img.save(png_out, format='PNG', optimize=True)
+        webp_img = img if img.mode in ('RGB', 'RGBA') else img.convert('RGBA')
+        webp_img.save(webp_out, format='WEBP', lossless=True, quality=100, method=4)
+
+    # Never ship an "optimized" PNG that is bigger than the original PNG. A
+    # JPEG source cannot stand in for a .png, so its re-encoding is kept.
+    if png_out.stat().st_size > src.stat().st_size:
+        if src.suffix.lower() == '.png':
+            png_out.write_bytes(src.read_bytes())
+        else:
+            print(f"⚠️  {src.name}: lossless PNG is larger than the {src.suffix} source")
+
+    return png_out.stat().st_size, webp_out.stat().st_size
+
+
+def load_cache(out_dir):
+    """Load the content-hash cache of the previous build."""
+    cache_file = out_dir / CACHE_FILENAME
+    if cache_file.exists():
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def save_cache(out_dir, cache):
+    """Save the content-hash cache for the next build."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with open(out_dir / CACHE_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+
+
+def collect_jobs(out_dir, cache, force=False):
+    """List the images that changed since the last build.
+
+    Returns (jobs, cache) where cache already holds the new hashes; the
+    size fields are filled once the job has run.
+    """
+    jobs = []
+    new_cache = {}
+    outputs = {}  # png output -> source, to catch x.jpg and x.png sharing x.png
+
+    for tree, folder in ASSET_TREES.items():
+        for src in sorted(folder.rglob('*')):
+            if src.suffix.lower() not in IMAGE_SUFFIXES or out_dir in src.parents:
+                continue
+
+            rel = f"{tree}/{src.relative_to(folder).as_posix()}"
+            png_out = out_dir / tree / src.relative_to(folder).with_suffix('.png')
+            webp_out = png_out.with_suffix('.webp')
+            if png_out in outputs:
+                raise SystemExit(f"{rel} and {outputs[png_out]} would both be written to "
+                                 f"{png_out.relative_to(out_dir)}, rename one of them")
+            outputs[png_out] = rel
+            digest = file_hash(src)
+
+            previous = cache.get(rel)
+            unchanged = (previous and previous['sha256'] == digest
+                         and png_out.exists() and webp_out.exists())
+            if unchanged and not force:
+                new_cache[rel] = previous
+                continue
+
+            new_cache[rel] = {'sha256': digest, 'original': src.stat().st_size}
+            jobs.append((rel, src, png_out, webp_out))
+
+    return jobs, new_cache
+
+
+def run_jobs(jobs, cache, workers):
+    """Optimize the images in parallel, return the number that failed.
+
+    A failing image is reported and left out of the cache, so the next
+    build retries it; the others are kept.
+    """
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {rel: pool.submit(optimize_one, src, png_out, webp_out)
+                   for rel, src, png_out, webp_out in jobs}
+        for rel, future in futures.items():
+            try:
+                cache[rel]['png'], cache[rel]['webp'] = future.result()
+            except Exception as e:
+                print(f"⚠️  {rel}: {e}")
+                failed += 1
+    return failed
+
+
+def report(cache, elapsed, built, skipped):
+    """Print bytes saved per asset tree and the total wall time."""
+    print(f"\n{'Folder':<10} {'Files':>6} {'Original':>12} {'PNG':>12} {'WebP':>12} {'Saved (PNG)':>12}")
+    print("-" * 68)
+
+    totals = [0, 0, 0, 0]
+    for tree in ASSET_TREES:
+        entries = [e for rel, e in cache.items() if rel.startswith(f"{tree}/")]
+        original = sum(e['original'] for e in entries)
+        png = sum(e['png'] for e in entries)
+        webp = sum(e['webp'] for e in entries)
+        print(f"{tree:<10} {len(entries):>6} {original:>12,} {png:>12,} {webp:>12,} {original - png:>12,}")
+        for i, value in enumerate((len(entries), original, png, webp)):
+            totals[i] += value
+
+    count, original, png, webp = totals
+    print("-" * 68)
+    print(f"{'total':<10} {count:>6} {original:>12,} {png:>12,} {webp:>12,} {original - png:>12,}")
+    print(f"\n✓ {built} optimized, {skipped} unchanged, in {elapsed:.2f}s wall time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimize game images (lossless PNG + WebP)")
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUT, help="output folder")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--force', action='store_true', help="ignore the hash cache")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    out_dir = args.out.resolve()
+
+    jobs, cache = collect_jobs(out_dir, load_cache(out_dir), force=args.force)
+    skipped = len(cache) - len(jobs)
+    failed = 0
+
+    try:
+        if jobs:
+            print(f"🖼  Optimizing {len(jobs)} images on {args.workers} workers...")
+            failed = run_jobs(jobs, cache, args.workers)
+    finally:
+        # Keep what was built even if the run is interrupted; unfinished images are redone next time
+        cache = {rel: entry for rel, entry in cache.items() if 'png' in entry}
+        save_cache(out_dir, cache)
+
+    report(cache, time.perf_counter() - start, len(jobs) - failed, skipped)
+    if failed:
+        raise SystemExit(f"{failed} images failed")
+
+
+if __name__ == '__main__':
+    main()
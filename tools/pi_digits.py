@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Pi digits build step
+Compute the decimals of Pi (Chudnovsky series, binary splitting) for the recitation mode
+
+Usage: python -m tools.pi_digits [--digits 500000] [--out pi_game/data/pi_digits.txt]
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_OUT = ROOT / "pi_game" / "data" / "pi_digits.txt"
+
+C3_OVER_24 = 640320 ** 3 // 24
+DIGITS_PER_TERM = 14.18  # each term of the series adds about 14 digits
+GUARD_DIGITS = 20
+
+
+def bs(a, b):
+    """Binary splitting of the series terms a..b-1: (P, Q, T)."""
+    if b - a == 1:
+        if a == 0:
+            p = q = 1
+        else:
+            p = (6 * a - 5) * (2 * a - 1) * (6 * a - 1)
+            q = a * a * a * C3_OVER_24
+        t = p * (13591409 + 545140134 * a)
+        return p, q, -t if a & 1 else t
+
+    m = (a + b) // 2
+    p1, q1, t1 = bs(a, m)
+    p2, q2, t2 = bs(m, b)
+    return p1 * p2, q1 * q2, q2 * t1 + p1 * t2
+
+
+def pi_decimals(digits):
+    """The first digits decimals of Pi (after "3.") as a string."""
+    precision = digits + GUARD_DIGITS
+    terms = int(precision / DIGITS_PER_TERM) + 1
+    _, q, t = bs(0, terms)
+    one = 10 ** precision
+    sqrt_10005 = math.isqrt(10005 * one * one)
+    pi = (q * 426880 * sqrt_10005) // t
+
+    # str() of a big int is capped to 4300 digits by default
+    sys.set_int_max_str_digits(0)
+    return str(pi)[1:digits + 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--digits', type=int, default=500_000, help="decimals to compute")
+    parser.add_argument('--out', type=Path, default=DEFAULT_OUT, help="text file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    decimals = pi_decimals(args.digits)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(decimals, encoding='ascii')
+    print(f"✓ {len(decimals)} decimals of Pi in {time.perf_counter() - start:.2f}s -> {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,50 +1,131 @@
 #!/usr/bin/env python3
 """
 Top 14 Quiz Game
-Test your knowledge about Top 14 2024-2025 season
+Test your knowledge about Top 14 seasons (latest by default, ?season=2024-2025)
 """
 
-from flask import Blueprint, render_template, jsonify
+from flask import Blueprint, render_template, jsonify, request
+import logging
 import random
 import json
+from itertools import islice
 from pathlib import Path
+from typing import NamedTuple
+
+from common import history, reload, seeding, tokens
+from common.cache import cached
+from common.ratings import RatingTable, report_answer
+from top14_quiz.seasons import SeasonStore
+
+log = logging.getLogger(__name__)
 
 # Create blueprint
 top14_quiz_bp = Blueprint('top14_quiz', __name__,
                           template_folder='templates',
                           static_folder='static')
 
-# Load data
+# One folder per season: stats/2024-2025/, stats/2025-2026/...
 DATA_FOLDER = Path(__file__).parent / "stats"
 
 
-def load_json_data(filename):
-    """Load JSON data file."""
-    try:
-        with open(DATA_FOLDER / filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {filename}: {e}")
+def load_json_data(folder, pattern):
+    """Load the JSON data file of a season folder matching pattern.
+
+    A missing file gives None; a file that doesn't parse (e.g. caught
+    halfway through an edit) raises, so the season isn't swapped.
+    """
+    matches = sorted(folder.glob(pattern))
+    if not matches:
+        log.warning("No %s in %s", pattern, folder.name)
         return None
+    with open(matches[0], 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# File of each dataset inside a season folder
+DATA_FILES = {
+    'classement': 'classement*.json',
+    'buteurs': 'meilleur-buteur*.json',
+    'stats': 'stats_globales*.json',
+    'playoffs': 'stats_phases_finales*.json',
+}
+
+
+# Numeric columns of the scorers file the explorer can sort on
+PLAYER_COLUMNS = ['rang', 'points', 'essais', 'penalites', 'drops', 'transformations', 'matches', 'minutes']
+
+
+class PlayerIndex(NamedTuple):
+    """Lookup structures over the scorers list, built once per load."""
+    by_club: dict  # club -> frozenset of row ids
+    by_poste: dict  # poste -> frozenset of row ids
+    orders: dict  # column -> row ids sorted by value (highest first)
+    positions: dict  # column -> position of each row id in orders[column]
+
+
+class Top14Data(NamedTuple):
+    """Immutable dataset of one Top 14 season."""
+    season: str
+    classement: list
+    buteurs: list
+    stats: dict
+    playoffs: dict
+    players: PlayerIndex
+
+
+def build_player_index(buteurs):
+    """Hash indexes on club and poste, and one sorted order per numeric column."""
+    by_club, by_poste = {}, {}
+    for i, row in enumerate(buteurs):
+        by_club.setdefault(row['club'], set()).add(i)
+        by_poste.setdefault(row['poste'], set()).add(i)
+
+    orders = {
+        column: tuple(sorted(range(len(buteurs)), key=lambda i: (-buteurs[i].get(column, 0), i)))
+        for column in PLAYER_COLUMNS
+    }
+    positions = {
+        column: {row_id: position for position, row_id in enumerate(order)}
+        for column, order in orders.items()
+    }
+
+    return PlayerIndex(
+        by_club={club: frozenset(ids) for club, ids in by_club.items()},
+        by_poste={poste: frozenset(ids) for poste, ids in by_poste.items()},
+        orders=orders,
+        positions=positions,
+    )
+
+
+def load_season(season, folder):
+    """Load the data files of one season folder."""
+    files = {field: load_json_data(folder, pattern) for field, pattern in DATA_FILES.items()}
+    new_data = Top14Data(season=season, **files, players=build_player_index(files['buteurs'] or []))
 
+    log.info("Loaded Top 14 season %s: %d équipes, %d buteurs, stats %s, playoffs %s", season,
+             len(new_data.classement or ()), len(new_data.buteurs or ()),
+             '✓' if new_data.stats else '✗', '✓' if new_data.playoffs else '✗')
+    return new_data
 
-# Load all data
-classement = load_json_data('classement_final_top_14_2025.json')
-buteurs = load_json_data('meilleur-buteur-2024-2025.json')
-stats = load_json_data('stats_globales_2024-2025.json')
-playoffs = load_json_data('stats_phases_finales_2025.json')
 
-print(f"📊 Loading Top 14 Quiz data...")
-print(f"  - Classement: {len(classement) if classement else 0} équipes")
-print(f"  - Buteurs: {len(buteurs) if buteurs else 0} joueurs")
-print(f"  - Stats: {'✓' if stats else '✗'}")
-print(f"  - Playoffs: {'✓' if playoffs else '✗'}")
+# Seasons are loaded on first use, the recent ones kept in memory
+seasons = SeasonStore(DATA_FOLDER, load_season)
+
+
+def request_season():
+    """The ?season= parameter (latest season by default), None if unknown."""
+    season = request.args.get('season') or seasons.latest
+    return season if season in seasons.seasons else None
+
+
+def unknown_season():
+    return jsonify({'error': f"Unknown season, available: {', '.join(seasons.seasons)}"}), 404
 
 # Question templates
 QUESTIONS = [
     {
         'type': 'rwc_meilleur_marqueur_essais',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a marqué le plus d\'essais à la Coupe du Monde 2023 ?',
             'options': ['Will Jordan', 'Damian Penaud', 'Bundee Aki', 'Henry Arundell'],
             'correct': 'Will Jordan'
@@ -52,7 +133,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_meilleur_buteur',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a marqué le plus de points à la Coupe du Monde 2023 ?',
             'options': ['Owen Farrell', 'Thomas Ramos', 'Emiliano Boffelli', 'Johnny Sexton'],
             'correct': 'Owen Farrell'
@@ -60,7 +141,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_points_farrell',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de points Owen Farrell a-t-il marqué à la Coupe du Monde 2023 ?',
             'options': ['75', '85', '65', '95'],
             'correct': '75'
@@ -68,7 +149,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_essais_jordan',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien d\'essais Will Jordan a-t-il marqué à la Coupe du Monde 2023 ?',
             'options': ['8', '6', '10', '5'],
             'correct': '8'
@@ -76,7 +157,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_conversions_ramos',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de transformations Thomas Ramos a-t-il réussi à la Coupe du Monde 2023 ?',
             'options': ['21', '18', '25', '15'],
             'correct': '21'
@@ -84,7 +165,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_plus_de_courses',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a fait le plus de courses (runs) à la Coupe du Monde 2023 ?',
             'options': ['Ardie Savea', 'Bundee Aki', 'Beauden Barrett', 'Ben Earl'],
             'correct': 'Ardie Savea'
@@ -92,7 +173,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_courses_savea',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de courses Ardie Savea a-t-il effectué à la Coupe du Monde 2023 ?',
             'options': ['82', '72', '92', '67'],
             'correct': '82'
@@ -100,7 +181,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_offloads',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a fait le plus d\'offloads à la Coupe du Monde 2023 ?',
             'options': ['Salesi Piutau', 'Antoine Dupont', 'Ardie Savea', 'Duncan Paia\'aua'],
             'correct': 'Salesi Piutau'
@@ -108,7 +189,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_clean_breaks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a fait le plus de clean breaks à la Coupe du Monde 2023 ?',
             'options': ['Damian Penaud', 'Will Jordan', 'Bundee Aki', 'Louis Bielle-Biarrey'],
             'correct': 'Damian Penaud'
@@ -116,7 +197,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_plaquages',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui a fait le plus de plaquages à la Coupe du Monde 2023 ?',
             'options': ['Marcos Kremer', 'Ben Earl', 'Franco Mostert', 'Pieter-Steph Du Toit'],
             'correct': 'Marcos Kremer'
@@ -124,7 +205,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_plaquages_kremer',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de plaquages Marcos Kremer a-t-il effectué à la Coupe du Monde 2023 ?',
             'options': ['92', '80', '73', '85'],
             'correct': '92'
@@ -132,7 +213,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_equipe_plus_points',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a marqué le plus de points à la Coupe du Monde 2023 ?',
             'options': ['Nouvelle-Zélande', 'France', 'Angleterre', 'Irlande'],
             'correct': 'Nouvelle-Zélande'
@@ -140,7 +221,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_points_all_blacks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de points la Nouvelle-Zélande a-t-elle marqué à la Coupe du Monde 2023 ?',
             'options': ['336', '238', '280', '310'],
             'correct': '336'
@@ -148,7 +229,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_equipe_plus_essais',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a marqué le plus d\'essais à la Coupe du Monde 2023 ?',
             'options': ['Nouvelle-Zélande', 'Irlande', 'France', 'Afrique du Sud'],
             'correct': 'Nouvelle-Zélande'
@@ -156,7 +237,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_essais_all_blacks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien d\'essais la Nouvelle-Zélande a-t-elle marqué à la Coupe du Monde 2023 ?',
             'options': ['49', '30', '40', '55'],
             'correct': '49'
@@ -164,7 +245,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_equipe_plus_plaquages',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a fait le plus de plaquages à la Coupe du Monde 2023 ?',
             'options': ['Afrique du Sud', 'Angleterre', 'Nouvelle-Zélande', 'Pays de Galles'],
             'correct': 'Afrique du Sud'
@@ -172,7 +253,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_plaquages_springboks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de plaquages l\'Afrique du Sud a-t-elle effectué à la Coupe du Monde 2023 ?',
             'options': ['972', '869', '864', '835'],
             'correct': '972'
@@ -180,7 +261,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_equipe_plus_offloads',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a fait le plus d\'offloads à la Coupe du Monde 2023 ?',
             'options': ['Nouvelle-Zélande', 'Écosse', 'France', 'Irlande'],
             'correct': 'Nouvelle-Zélande'
@@ -188,7 +269,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_equipe_plus_clean_breaks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a fait le plus de clean breaks à la Coupe du Monde 2023 ?',
             'options': ['Nouvelle-Zélande', 'France', 'Écosse', 'Argentine'],
             'correct': 'Nouvelle-Zélande'
@@ -196,7 +277,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_clean_breaks_all_blacks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de clean breaks la Nouvelle-Zélande a-t-elle fait à la Coupe du Monde 2023 ?',
             'options': ['88', '55', '72', '95'],
             'correct': '88'
@@ -204,7 +285,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_cartons_jaunes_equipe',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a reçu le plus de cartons jaunes à la Coupe du Monde 2023 ?',
             'options': ['Roumanie', 'Nouvelle-Zélande', 'Fidji', 'Samoa'],
             'correct': 'Roumanie'
@@ -212,7 +293,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_cartons_rouges_equipe',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a reçu le plus de cartons rouges à la Coupe du Monde 2023 ?',
             'options': ['Nouvelle-Zélande', 'Namibie', 'Tonga', 'Samoa'],
             'correct': 'Nouvelle-Zélande'
@@ -220,7 +301,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_dupont_offloads',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien d\'offloads Antoine Dupont a-t-il fait à la Coupe du Monde 2023 ?',
             'options': ['10', '8', '12', '6'],
             'correct': '10'
@@ -228,7 +309,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_penaud_clean_breaks',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de clean breaks Damian Penaud a-t-il fait à la Coupe du Monde 2023 ?',
             'options': ['13', '12', '10', '15'],
             'correct': '13'
@@ -236,7 +317,7 @@ QUESTIONS = [
     },
     {
         'type': 'rwc_earl_plaquages',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de plaquages Ben Earl a-t-il effectué à la Coupe du Monde 2023 ?',
             'options': ['80', '92', '73', '66'],
             'correct': '80'
@@ -245,86 +326,86 @@ QUESTIONS = [
     # Questions sur le classement
     {
         'type': 'classement_champion',
-        'generate': lambda: {
-            'question': 'Quelle équipe a remporté le Top 14 2024-2025 ?',
-            'options': [classement[0]['club'], classement[1]['club'], classement[2]['club'], classement[3]['club']],
-            'correct': playoffs['phase_finale']['finale']['champion']
+        'generate': lambda rng, d: {
+            'question': f'Quelle équipe a remporté le Top 14 {d.season} ?',
+            'options': [d.classement[0]['club'], d.classement[1]['club'], d.classement[2]['club'], d.classement[3]['club']],
+            'correct': d.playoffs['phase_finale']['finale']['champion']
         }
     },
     {
         'type': 'classement_position',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': f"Quelle équipe a terminé à la 2ème place du classement ?",
-            'options': [classement[i]['club'] for i in [1, 2, 3, 4]],
-            'correct': classement[1]['club']
+            'options': [d.classement[i]['club'] for i in [1, 2, 3, 4]],
+            'correct': d.classement[1]['club']
         }
     },
     {
         'type': 'classement_dernier',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a terminé dernière du classement ?',
-            'options': [classement[i]['club'] for i in [11, 12, 13, 10]],
-            'correct': classement[13]['club']
+            'options': [d.classement[i]['club'] for i in [11, 12, 13, 10]],
+            'correct': d.classement[13]['club']
         }
     },
     {
         'type': 'classement_points',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a marqué le plus de points en saison régulière ?',
-            'options': [c['club'] for c in stats['statistiques_clubs']['meilleure_attaque'][:4]],
-            'correct': stats['statistiques_clubs']['meilleure_attaque'][0]['club']
+            'options': [c['club'] for c in d.stats['statistiques_clubs']['meilleure_attaque'][:4]],
+            'correct': d.stats['statistiques_clubs']['meilleure_attaque'][0]['club']
         }
     },
     {
         'type': 'meilleur_buteur',
-        'generate': lambda: {
-            'question': 'Qui est le meilleur réalisateur de la saison 2024-2025 ?',
-            'options': [b['nom'] for b in buteurs[:4]],
-            'correct': buteurs[0]['nom']
+        'generate': lambda rng, d: {
+            'question': f'Qui est le meilleur réalisateur de la saison {d.season} ?',
+            'options': [b['nom'] for b in d.buteurs[:4]],
+            'correct': d.buteurs[0]['nom']
         }
     },
     {
         'type': 'buteur_club',
-        'generate': lambda: {
-            'buteur': buteurs[random.randint(0, min(9, len(buteurs) - 1))],
+        'generate': lambda rng, d: {
+            'buteur': d.buteurs[rng.randint(0, min(9, len(d.buteurs) - 1))],
             'question': lambda b: f"Dans quel club joue {b['nom']} ?",
-            'options': lambda b: random.sample([c['club'] for c in classement[:8] if c['club'] != b['club']], 3) + [
+            'options': lambda b: rng.sample([c['club'] for c in d.classement[:8] if c['club'] != b['club']], 3) + [
                 b['club']],
             'correct': lambda b: b['club']
         }
     },
     {
         'type': 'buteur_points',
-        'generate': lambda: {
-            'question': f"Combien de points {buteurs[0]['nom']} a-t-il marqué cette saison ?",
-            'correct_val': buteurs[0]['points'],
+        'generate': lambda rng, d: {
+            'question': f"Combien de points {d.buteurs[0]['nom']} a-t-il marqué cette saison ?",
+            'correct_val': d.buteurs[0]['points'],
             'options': lambda v: [str(v), str(v + 20), str(v - 30), str(v + 50)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'meilleur_essayeur',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui est le meilleur marqueur d\'essais de la saison ?',
-            'options': [p['nom'] for p in stats['meilleurs_joueurs']['meilleur_marqueur_essais'][:3]] + [
-                buteurs[0]['nom']],
-            'correct': stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['nom']
+            'options': [p['nom'] for p in d.stats['meilleurs_joueurs']['meilleur_marqueur_essais'][:3]] + [
+                d.buteurs[0]['nom']],
+            'correct': d.stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['nom']
         }
     },
     {
         'type': 'essayeur_nombre',
-        'generate': lambda: {
-            'question': f"Combien d'essais {stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['nom']} a-t-il marqué ?",
-            'correct_val': stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['essais'],
+        'generate': lambda rng, d: {
+            'question': f"Combien d'essais {d.stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['nom']} a-t-il marqué ?",
+            'correct_val': d.stats['meilleurs_joueurs']['meilleur_marqueur_essais'][0]['essais'],
             'options': lambda v: [str(v), str(v + 3), str(v - 2), str(v + 5)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'finale_score',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de la finale ?',
-            'finale': playoffs['phase_finale']['finale'],
+            'finale': d.playoffs['phase_finale']['finale'],
             'options': lambda f: [
                 f"{f['score_domicile']} - {f['score_exterieur']}",
                 f"{f['score_domicile'] + 5} - {f['score_exterieur']}",
@@ -336,102 +417,102 @@ QUESTIONS = [
     },
     {
         'type': 'finale_adversaire',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a perdu en finale ?',
-            'options': [classement[i]['club'] for i in [1, 2, 3, 4]],
-            'correct': playoffs['phase_finale']['finale']['equipe_exterieur']
+            'options': [d.classement[i]['club'] for i in [1, 2, 3, 4]],
+            'correct': d.playoffs['phase_finale']['finale']['equipe_exterieur']
         }
     },
     {
         'type': 'stats_essais',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien d\'essais ont été marqués au total cette saison ?',
-            'correct_val': stats['essais']['total'],
+            'correct_val': d.stats['essais']['total'],
             'options': lambda v: [str(v), str(v + 50), str(v - 100), str(v + 150)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'stats_cartons_rouges',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de cartons rouges ont été distribués cette saison ?',
-            'correct_val': stats['cartons']['rouges'],
+            'correct_val': d.stats['cartons']['rouges'],
             'options': lambda v: [str(v), str(v + 5), str(v + 10), str(v - 5) if v > 5 else str(v + 3)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'stats_cartons_jaunes',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de cartons jaunes ont été distribués cette saison ?',
-            'correct_val': stats['cartons']['jaunes'],
+            'correct_val': d.stats['cartons']['jaunes'],
             'options': lambda v: [str(v), str(v + 30), str(v - 50), str(v + 80)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'meilleur_gratteur',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Qui est le meilleur gratteur de la saison ?',
-            'options': [p['nom'] for p in stats['meilleurs_joueurs']['meilleur_gratteur'][:4]],
-            'correct': stats['meilleurs_joueurs']['meilleur_gratteur'][0]['nom']
+            'options': [p['nom'] for p in d.stats['meilleurs_joueurs']['meilleur_gratteur'][:4]],
+            'correct': d.stats['meilleurs_joueurs']['meilleur_gratteur'][0]['nom']
         }
     },
     {
         'type': 'gratteur_nombre',
-        'generate': lambda: {
-            'question': f"Combien de ballons {stats['meilleurs_joueurs']['meilleur_gratteur'][0]['nom']} a-t-il gratté ?",
-            'correct_val': stats['meilleurs_joueurs']['meilleur_gratteur'][0]['ballons_grattes'],
+        'generate': lambda rng, d: {
+            'question': f"Combien de ballons {d.stats['meilleurs_joueurs']['meilleur_gratteur'][0]['nom']} a-t-il gratté ?",
+            'correct_val': d.stats['meilleurs_joueurs']['meilleur_gratteur'][0]['ballons_grattes'],
             'options': lambda v: [str(v), str(v + 5), str(v - 3), str(v + 10)],
             'correct': lambda v: str(v)
         }
     },
     {
         'type': 'possession',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a eu le meilleur temps de possession ?',
-            'options': [c['club'] for c in stats['statistiques_clubs']['meilleur_temps_possession'][:4]],
-            'correct': stats['statistiques_clubs']['meilleur_temps_possession'][0]['club']
+            'options': [c['club'] for c in d.stats['statistiques_clubs']['meilleur_temps_possession'][:4]],
+            'correct': d.stats['statistiques_clubs']['meilleur_temps_possession'][0]['club']
         }
     },
     {
         'type': 'defense',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a la meilleure défense (moins de points encaissés) ?',
-            'options': [c['club'] for c in stats['statistiques_clubs']['meilleure_defense'][:4]],
-            'correct': stats['statistiques_clubs']['meilleure_defense'][0]['club']
+            'options': [c['club'] for c in d.stats['statistiques_clubs']['meilleure_defense'][:4]],
+            'correct': d.stats['statistiques_clubs']['meilleure_defense'][0]['club']
         }
     },
     {
         'type': 'barrages',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a gagné son match de barrage ?',
             'options': [
-                playoffs['phase_finale']['barrages'][0]['vainqueur'],
-                playoffs['phase_finale']['barrages'][1]['vainqueur'],
-                playoffs['phase_finale']['barrages'][0]['equipe_exterieur'],
-                playoffs['phase_finale']['barrages'][1]['equipe_exterieur']
+                d.playoffs['phase_finale']['barrages'][0]['vainqueur'],
+                d.playoffs['phase_finale']['barrages'][1]['vainqueur'],
+                d.playoffs['phase_finale']['barrages'][0]['equipe_exterieur'],
+                d.playoffs['phase_finale']['barrages'][1]['equipe_exterieur']
             ],
-            'correct': random.choice([
-                playoffs['phase_finale']['barrages'][0]['vainqueur'],
-                playoffs['phase_finale']['barrages'][1]['vainqueur']
+            'correct': rng.choice([
+                d.playoffs['phase_finale']['barrages'][0]['vainqueur'],
+                d.playoffs['phase_finale']['barrages'][1]['vainqueur']
             ])
         }
     },
     {
         'type': 'moyenne_points',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle est la moyenne de points par match cette saison ?',
-            'correct_val': stats['points']['moyenne_par_match'],
+            'correct_val': d.stats['points']['moyenne_par_match'],
             'options': lambda v: [f"{v:.1f}", f"{v + 5:.1f}", f"{v - 3:.1f}", f"{v + 10:.1f}"],
             'correct': lambda v: f"{v:.1f}"
         }
     },
     {
         'type': 'victoires_domicile',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel pourcentage de victoires à domicile cette saison ?',
-            'correct_val': stats['matches']['victoires_domicile']['pourcentage'],
+            'correct_val': d.stats['matches']['victoires_domicile']['pourcentage'],
             'options': lambda v: [f"{v}%", f"{v + 5}%", f"{v - 10}%", f"{v + 15}%"],
             'correct': lambda v: f"{v}%"
         }
@@ -439,7 +520,7 @@ QUESTIONS = [
     # Questions sur le Tournoi des 6 Nations 2024
     {
         'type': '6n_champion_2024',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a remporté le Tournoi des 6 Nations 2024 ?',
             'options': ['France', 'Angleterre', 'Irlande', 'Écosse'],
             'correct': 'France'
@@ -447,7 +528,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_points_france',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de points la France a-t-elle au classement du Tournoi des 6 Nations 2024 ?',
             'options': ['21', '20', '19', '18'],
             'correct': '21'
@@ -455,7 +536,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_deuxieme_place',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a terminé 2ème du Tournoi des 6 Nations 2024 ?',
             'options': ['Angleterre', 'Irlande', 'Écosse', 'France'],
             'correct': 'Angleterre'
@@ -463,7 +544,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_derniere_place',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quelle équipe a terminé dernière du Tournoi des 6 Nations 2024 ?',
             'options': ['Pays de Galles', 'Italie', 'Écosse', 'France'],
             'correct': 'Pays de Galles'
@@ -471,7 +552,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_france_points_marques',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de points la France a-t-elle marqué au total dans le Tournoi des 6 Nations 2024 ?',
             'options': ['218', '179', '238', '195'],
             'correct': '218'
@@ -479,7 +560,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_france_galles',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de France vs Pays de Galles (1er match) ?',
             'options': ['43-0', '35-10', '50-5', '38-7'],
             'correct': '43-0'
@@ -487,7 +568,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_irlande_france',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de Irlande vs France (dernier match) ?',
             'options': ['27-42', '30-35', '25-40', '20-45'],
             'correct': '27-42'
@@ -495,7 +576,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_angleterre_galles',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de Pays de Galles vs Angleterre ?',
             'options': ['14-68', '10-50', '20-60', '7-55'],
             'correct': '14-68'
@@ -503,7 +584,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_france_ecosse',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de France vs Écosse (dernier match) ?',
             'options': ['35-16', '30-20', '40-15', '28-18'],
             'correct': '35-16'
@@ -511,7 +592,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_ecosse_irlande',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Quel était le score de Écosse vs Irlande ?',
             'options': ['18-32', '20-30', '15-28', '22-35'],
             'correct': '18-32'
@@ -519,7 +600,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_victoires_france',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de victoires la France a-t-elle obtenu dans le Tournoi des 6 Nations 2024 ?',
             'options': ['4', '5', '3', '2'],
             'correct': '4'
@@ -527,7 +608,7 @@ QUESTIONS = [
     },
     {
         'type': '6n_defaites_galles',
-        'generate': lambda: {
+        'generate': lambda rng, d: {
             'question': 'Combien de défaites le Pays de Galles a-t-il subi dans le Tournoi des 6 Nations 2024 ?',
             'options': ['5', '4', '3', '2'],
             'correct': '5'
@@ -535,67 +616,188 @@ QUESTIONS = [
     },
 ]
 
+QUESTION_TYPES = [q['type'] for q in QUESTIONS]
+
+# Difficulty rating of each question template (one slot per type)
+ratings = RatingTable(Path(__file__).parent / "data" / "top14_ratings.json", QUESTION_TYPES)
+
+
+def build_question(rng=None, adaptive=False, season=None):
+    """Build one quiz question from a random template.
+
+    rng is a seeded random.Random for reproducible questions (defaults to
+    the shared random module). With adaptive the template is picked
+    according to the ratings, favouring the most informative questions.
+    season defaults to the latest one; None when there is no such season.
+    """
+    d = seasons.get(season)
+    if d is None:
+        return None
+    token_nonce = seeding.nonce(rng)
+    rng = rng or random
+
+    # Select random question type
+    if adaptive:
+        q_template = rng.choices(QUESTIONS, weights=ratings.weights(QUESTION_TYPES))[0]
+    else:
+        q_template = rng.choice(QUESTIONS)
+
+    return generate_question(q_template, d, rng, token_nonce)
+
+
+def generate_question(q_template, d, rng, token_nonce=None):
+    """Question body from one template."""
+    q_data = q_template['generate'](rng, d)
+
+    # Handle complex question generation
+    if 'buteur' in q_data:
+        buteur = q_data['buteur']
+        question = q_data['question'](buteur)
+        options = q_data['options'](buteur)
+        correct = q_data['correct'](buteur)
+    elif 'finale' in q_data:
+        finale = q_data['finale']
+        question = q_data['question']
+        options = q_data['options'](finale)
+        correct = q_data['correct'](finale)
+    elif 'correct_val' in q_data:
+        val = q_data['correct_val']
+        question = q_data['question']
+        options = q_data['options'](val)
+        correct = q_data['correct'](val)
+    else:
+        question = q_data['question']
+        options = q_data['options'][:]
+        correct = q_data['correct']
+
+    # Shuffle options
+    rng.shuffle(options)
+
+    return {
+        'question': question,
+        'options': options,
+        'correct': correct,
+        'token': tokens.question_token('top14', correct, q_template['type'], token_nonce)
+    }
+
+
+def build_round(n, rng=None, season=None):
+    """Deal up to n questions from n different templates (None for an unknown season)."""
+    d = seasons.get(season)
+    if d is None:
+        return None
+    seeded = rng is not None
+    rng = rng or random
+
+    return [generate_question(q_template, d, rng, seeding.nonce(rng) if seeded else None)
+            for q_template in rng.sample(QUESTIONS, min(n, len(QUESTIONS)))]
+
+
 @top14_quiz_bp.route('/api/all-questions')
 def get_all_questions():
-    """Generate all possible questions for offline mode."""
+    """Generate all possible questions for offline mode (seed + index for a reproducible set)."""
+    season = request_season()
+    if season is None:
+        return unknown_season()
+
     try:
+        rng = seeding.request_rng('top14')
+
+        # Generate 50 questions total
         all_questions = []
+        for _ in range(50):
+            question = build_question(rng, season=season)
+            if question is None:
+                return unknown_season()
+            del question['token']
+            all_questions.append(question)
 
-        # Generate multiple instances of each question type
-        for _ in range(50):  # Generate 50 questions total
-            q_template = random.choice(QUESTIONS)
-            q_data = q_template['generate']()
-
-            # Handle complex question generation
-            if 'buteur' in q_data:
-                buteur = q_data['buteur']
-                question = q_data['question'](buteur)
-                options = q_data['options'](buteur)
-                correct = q_data['correct'](buteur)
-            elif 'finale' in q_data:
-                finale = q_data['finale']
-                question = q_data['question']
-                options = q_data['options'](finale)
-                correct = q_data['correct'](finale)
-            elif 'correct_val' in q_data:
-                val = q_data['correct_val']
-                question = q_data['question']
-                options = q_data['options'](val)
-                correct = q_data['correct'](val)
-            else:
-                question = q_data['question']
-                options = q_data['options'][:]
-                correct = q_data['correct']
-
-            # Shuffle options
-            random.shuffle(options)
-
-            all_questions.append({
-                'question': question,
-                'options': options,
-                'correct': correct
-            })
-
-        return jsonify({
+        return seeding.make_cacheable(jsonify({
             'questions': all_questions
-        })
+        }), rng)
 
     except Exception as e:
-        print(f"Error generating questions: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error generating questions: %s", e)
         return jsonify({'error': 'Failed to generate questions'}), 500
 
 @top14_quiz_bp.route('/api/all-data')
+@cached('top14', args=('season',))
 def get_all_data():
-    """Get all quiz data for offline mode."""
+    """Get all quiz data of a season for offline mode."""
+    season = request_season()
+    if season is None:
+        return unknown_season()
+
+    d = seasons.get(season)
+    if d is None:
+        return unknown_season()
+    return jsonify({'season': season, **{field: getattr(d, field) for field in DATA_FILES}})
+
+
+@top14_quiz_bp.route('/api/seasons')
+def get_seasons():
+    """List the available seasons, latest last."""
+    return jsonify({'seasons': list(seasons.seasons), 'latest': seasons.latest})
+
+
+@top14_quiz_bp.route('/api/players')
+def get_players():
+    """Explore the scorers: ?club=&poste=&sort=&order=asc|desc&limit=&offset=
+
+    Filters are hash-index lookups. Sorting walks the column's presorted
+    order and stops after offset + limit matches, or sorts the matching ids
+    by their precomputed position when the filters leave only a few rows.
+    """
+    season = request_season()
+    if season is None:
+        return unknown_season()
+
+    d = seasons.get(season)
+    if d is None:
+        return unknown_season()
+    index = d.players
+    sort = request.args.get('sort', 'rang')
+    descending = request.args.get('order', 'asc' if sort == 'rang' else 'desc') == 'desc'
+    limit = min(max(request.args.get('limit', 20, type=int), 0), 100)
+    offset = max(request.args.get('offset', 0, type=int), 0)
+
+    if sort not in PLAYER_COLUMNS:
+        return jsonify({'error': f"sort must be one of {', '.join(PLAYER_COLUMNS)}"}), 400
+
+    # Intersect the filter sets, smallest first
+    filters = []
+    for param, lookup in (('club', index.by_club), ('poste', index.by_poste)):
+        value = request.args.get(param)
+        if value is not None:
+            filters.append(lookup.get(value, frozenset()))
+
+    order = index.orders[sort]
+    if not filters:
+        total = len(order)
+        if descending:
+            page = order[offset:offset + limit]
+        else:
+            # Slice the page from the end of the order: only the page is copied
+            page = order[max(total - offset - limit, 0):max(total - offset, 0)][::-1]
+    else:
+        filters.sort(key=len)
+        matches = filters[0].intersection(*filters[1:])
+        total = len(matches)
+        if len(matches) * 4 < len(order):
+            position = index.positions[sort]
+            page = sorted(matches, key=position.__getitem__, reverse=not descending)[offset:offset + limit]
+        else:
+            # Stops walking the order as soon as the page is full
+            walk = order if descending else reversed(order)
+            page = list(islice((row_id for row_id in walk if row_id in matches), offset, offset + limit))
+
     return jsonify({
-        'classement': classement,
-        'buteurs': buteurs,
-        'stats': stats,
-        'playoffs': playoffs
+        'total': total,
+        'offset': offset,
+        'players': [d.buteurs[row_id] for row_id in page]
     })
 
+
 @top14_quiz_bp.route('/')
 def index():
     """Serve the main game page."""
@@ -604,47 +806,84 @@ def index():
 
 @top14_quiz_bp.route('/api/question')
 def get_question():
-    """Get a random quiz question."""
+    """Get a random quiz question.
+
+    Optional query parameters: season (latest by default), adaptive=1 to
+    pick by rating, and seed + index for a reproducible question.
+    """
+    season = request_season()
+    if season is None:
+        return unknown_season()
+
     try:
-        # Select random question type
-        q_template = random.choice(QUESTIONS)
-        q_data = q_template['generate']()
-
-        # Handle complex question generation
-        if 'buteur' in q_data:
-            buteur = q_data['buteur']
-            question = q_data['question'](buteur)
-            options = q_data['options'](buteur)
-            correct = q_data['correct'](buteur)
-        elif 'finale' in q_data:
-            finale = q_data['finale']
-            question = q_data['question']
-            options = q_data['options'](finale)
-            correct = q_data['correct'](finale)
-        elif 'correct_val' in q_data:
-            val = q_data['correct_val']
-            question = q_data['question']
-            options = q_data['options'](val)
-            correct = q_data['correct'](val)
-        else:
-            question = q_data['question']
-            options = q_data['options']
-            correct = q_data['correct']
+        rng = seeding.request_rng('top14')
+        adaptive = request.args.get('adaptive', 0, type=int)
+        response = build_question(rng, adaptive=adaptive, season=season)
+        if response is None:
+            return unknown_season()
 
-        # Shuffle options
-        random.shuffle(options)
+        # The answer comes back from /api/verify
+        del response['correct']
 
-        return jsonify({
-            'question': question,
-            'options': options,
-            'correct': correct
-        })
+        return seeding.make_cacheable(jsonify(response), rng, deterministic=not adaptive)
 
     except Exception as e:
-        print(f"Error generating question: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error generating question: %s", e)
         return jsonify({'error': 'Failed to generate question'}), 500
 
 
-print(f"✓ Top 14 Quiz loaded with {len(QUESTIONS)} question types\n")
\ No newline at end of file
+@top14_quiz_bp.route('/api/round')
+def get_round():
+    """Deal a whole game (?n=10, max 50) with no question repeated.
+
+    Accepts season and seed + index like /api/question.
+    """
+    season = request_season()
+    if season is None:
+        return unknown_season()
+
+    try:
+        n = min(max(request.args.get('n', 10, type=int), 1), 50)
+        rng = seeding.request_rng('top14:round')
+        questions = build_round(n, rng, season)
+        if questions is None:
+            return unknown_season()
+
+        for question in questions:
+            del question['correct']
+
+        return seeding.make_cacheable(jsonify({'questions': questions}), rng)
+
+    except Exception as e:
+        log.exception("Error generating round: %s", e)
+        return jsonify({'error': 'Failed to generate round'}), 500
+
+
+@top14_quiz_bp.route('/api/verify', methods=['POST'])
+def verify_answer():
+    """Check an answer against its question token."""
+    body, status = tokens.check_answer('top14', request.json)
+    if status == 200:
+        ratings.update(body['item'], body['correct'])
+        history.record_answer('top14', body['item'], body['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@top14_quiz_bp.route('/api/report-answer', methods=['POST'])
+def report_quiz_answer():
+    """Report an answer ({item: question type, correct}) to update its rating."""
+    body, status = report_answer(ratings, request.json)
+    if status == 200:
+        history.record_answer('top14', body['item'], request.json['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@top14_quiz_bp.route('/api/ratings')
+def get_ratings():
+    """Get question types from hardest to easiest."""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'ratings': ratings.to_dict(limit)})
+
+
+log.info("Top 14 Quiz loaded with %d question types", len(QUESTIONS))
+reload.register('top14', seasons.reset, watch=[DATA_FOLDER])
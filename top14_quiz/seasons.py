@@ -0,0 +1,111 @@
+"""
+Top 14 season partitions
+Each season lives in its own folder under stats/ (e.g. stats/2024-2025/).
+Folders are only listed at startup; a season is loaded on first use and
+the most recently used ones are kept in an LRU. Loading happens outside
+the store lock, so a cold season never blocks requests for the others.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+SEASON_PATTERN = re.compile(r'^\d{4}-\d{4}$')
+DEFAULT_CAPACITY = 3
+
+
+class SeasonStore:
+    """Lazily loaded seasons, at most capacity of them in memory.
+
+    load(season, folder) builds the immutable dataset of one season.
+    """
+
+    def __init__(self, folder, load, capacity=None):
+        self.folder = folder
+        self.load = load
+        self.capacity = capacity or int(os.environ.get('TOP14_SEASONS_CACHED', DEFAULT_CAPACITY))
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.loading = {}  # season -> lock held while it is read from disk
+        self.loads = 0
+        self.seasons = ()
+        self.discover()
+
+    def discover(self):
+        """List the season folders (names only, nothing is read), oldest first."""
+        if self.folder.is_dir():
+            self.seasons = tuple(sorted(p.name for p in self.folder.iterdir()
+                                        if p.is_dir() and SEASON_PATTERN.match(p.name)))
+        else:
+            self.seasons = ()
+        return self.seasons
+
+    @property
+    def latest(self):
+        return self.seasons[-1] if self.seasons else None
+
+    def get(self, season=None):
+        """Dataset of a season (the latest by default), or None if unknown."""
+        season = season or self.latest
+        if season not in self.seasons:
+            return None
+
+        entry = self._cached(season)
+        if entry is not None:
+            return entry
+
+        # One load per season at a time; the others wait for it, not for the store
+        with self.lock:
+            loading = self.loading.setdefault(season, threading.Lock())
+        with loading:
+            entry = self._cached(season)
+            if entry is not None:
+                return entry
+            try:
+                entry = self.load(season, self.folder / season)
+            finally:
+                with self.lock:
+                    self.loading.pop(season, None)
+
+            with self.lock:
+                self.loads += 1
+                self.entries[season] = entry
+                while len(self.entries) > self.capacity:
+                    self.entries.popitem(last=False)
+            return entry
+
+    def _cached(self, season):
+        """Resident dataset of a season (marked as recently used), or None."""
+        with self.lock:
+            entry = self.entries.get(season)
+            if entry is not None:
+                self.entries.move_to_end(season)
+            return entry
+
+    def reset(self):
+        """List the folders again and reload the resident seasons (hot reload).
+
+        A season that fails to load keeps its previous data; the first
+        error is raised once the others are done.
+        """
+        seasons = self.discover()
+        with self.lock:
+            resident = [(season, entry) for season, entry in self.entries.items() if season in seasons]
+
+        fresh, errors = [], []
+        for season, entry in resident:
+            try:
+                entry = self.load(season, self.folder / season)
+            except Exception as e:
+                errors.append(e)
+            fresh.append((season, entry))
+
+        with self.lock:
+            self.entries = OrderedDict(fresh)
+        if errors:
+            raise errors[0]
+
+    def stats(self):
+        return {'seasons': list(self.seasons), 'loaded': list(self.entries),
+                'capacity': self.capacity, 'loads': self.loads}
@@ -4,10 +4,19 @@ Stade Toulousain Player Guessing Game
 Guess the player's name and position from their photo
 """
 
-from flask import Blueprint, render_template, jsonify, send_from_directory
+from flask import Blueprint, render_template, jsonify, send_from_directory, request
+import logging
 import random
 import os
 from pathlib import Path
+from typing import NamedTuple
+
+from common import history, reload, seeding, tokens
+from common.cache import cached
+from common.fuzzy import FuzzyIndex
+from common.ratings import RatingTable, report_answer
+
+log = logging.getLogger(__name__)
 
 # Create blueprint
 toulouse_game_bp = Blueprint('toulouse_game', __name__,
@@ -27,27 +36,38 @@ POSITIONS = {
     'demi_d_ouverture_png': "Demi d'ouverture"
 }
 
-players_data = []
+
+class PlayerSnapshot(NamedTuple):
+    """Immutable squad, swapped as a whole on reload."""
+    players: tuple
+    names: FuzzyIndex  # typed-answer index over players' names
+    # Photos are served under an opaque id: their path gives the name and position away
+    photos: dict  # photo id -> image_path
+
+
+snapshot = PlayerSnapshot((), FuzzyIndex([]), {})
+
+# Difficulty rating of each player photo (one slot per image_path)
+ratings = RatingTable(Path(__file__).parent / "data" / "toulouse_ratings.json")
 
 
 def load_players():
-    """Load all players from folders."""
-    global players_data
+    """Load all players from folders into a new snapshot and swap it in."""
+    global snapshot
     players_data = []
 
-    print(f"🔍 Looking for players in: {PLAYERS_FOLDER}")
-    print(f"🔍 Folder exists: {PLAYERS_FOLDER.exists()}")
+    log.debug("Looking for players in %s (exists: %s)", PLAYERS_FOLDER, PLAYERS_FOLDER.exists())
 
     for folder_name, position in POSITIONS.items():
         folder_path = PLAYERS_FOLDER / folder_name
 
         if not folder_path.exists():
-            print(f"⚠️  Warning: Folder {folder_path} does not exist")
+            log.warning("Folder %s does not exist", folder_path)
             continue
 
         # Get all PNG files in the folder
-        png_files = list(folder_path.glob("*.png"))
-        print(f"✓ Found {len(png_files)} files in {folder_name}")
+        png_files = sorted(folder_path.glob("*.png"))
+        log.debug("Found %d files in %s", len(png_files), folder_name)
 
         for png_file in png_files:
             # Extract player name from filename (remove .png extension)
@@ -73,14 +93,22 @@ def load_players():
                 'folder': folder_name
             })
 
-    print(f"\n✓ Loaded {len(players_data)} players from Stade Toulousain\n")
-    return players_data
+    for player in players_data:
+        ratings.slot(player['image_path'])
+
+    # Single assignment: requests see either the old or the new snapshot
+    snapshot = PlayerSnapshot(tuple(players_data), FuzzyIndex([p['name'] for p in players_data]),
+                              {tokens.opaque_id(p['image_path']): p['image_path'] for p in players_data})
+
+    log.info("Loaded %d players from Stade Toulousain", len(players_data))
+    return snapshot
 
 @toulouse_game_bp.route('/api/all-players')
+@cached('players')
 def get_all_players():
-    """Get all players data for offline mode."""
+    """Get all players (name and position) for offline mode, without their photos."""
     return jsonify({
-        'players': players_data,
+        'players': [{'name': p['name'], 'position': p['position']} for p in snapshot.players],
         'positions': list(POSITIONS.values())
     })
 
@@ -90,47 +118,195 @@ def index():
     return render_template('toulouse_game.html')
 
 
-@toulouse_game_bp.route('/players/<path:filename>')
-def serve_player_image(filename):
-    """Serve player images."""
-    return send_from_directory(PLAYERS_FOLDER, filename)
+@toulouse_game_bp.route('/photos/<photo_id>')
+def serve_player_image(photo_id):
+    """Serve a player photo by the opaque id questions carry."""
+    image_path = snapshot.photos.get(photo_id)
+    if image_path is None:
+        return jsonify({'error': 'Unknown photo'}), 404
+    return send_from_directory(PLAYERS_FOLDER, image_path)
 
 
-@toulouse_game_bp.route('/api/question')
-def get_question():
-    """Get a random player question."""
-    if len(players_data) < 4:
-        return jsonify({'error': 'Not enough players loaded'}), 404
+def build_question(rng=None, adaptive=False):
+    """Build one player question.
+
+    rng is a seeded random.Random for reproducible questions (defaults to
+    the shared random module). With adaptive the player is picked according
+    to the ratings, favouring the most informative photos.
+    """
+    players_data = snapshot.players
+    token_nonce = seeding.nonce(rng)
+    rng = rng or random
 
     # Select a random correct player
-    correct_player = random.choice(players_data)
+    if adaptive:
+        weights = ratings.weights([p['image_path'] for p in players_data])
+        correct_player = rng.choices(players_data, weights=weights)[0]
+    else:
+        correct_player = rng.choice(players_data)
 
+    return make_question(correct_player, players_data, rng, token_nonce)
+
+
+def make_question(correct_player, players_data, rng, token_nonce=None):
+    """Question body about one player, with wrong options drawn from the squad."""
     # Get 3 other random names for wrong answers
     other_players = [p for p in players_data if p['name'] != correct_player['name']]
-    wrong_names = random.sample(other_players, min(3, len(other_players)))
+    wrong_names = rng.sample(other_players, min(3, len(other_players)))
 
     # Create name options
     name_options = [correct_player['name']] + [p['name'] for p in wrong_names]
-    random.shuffle(name_options)
+    rng.shuffle(name_options)
 
     # Get 3 other random positions for wrong answers
     all_positions = list(POSITIONS.values())
     wrong_positions = [p for p in all_positions if p != correct_player['position']]
-    position_options = [correct_player['position']] + random.sample(wrong_positions, min(3, len(wrong_positions)))
-    random.shuffle(position_options)
+    position_options = [correct_player['position']] + rng.sample(wrong_positions, min(3, len(wrong_positions)))
+    rng.shuffle(position_options)
 
-    return jsonify({
-        'image': correct_player['image_path'],
+    return {
+        'image': tokens.opaque_id(correct_player['image_path']),
         'name_options': name_options,
         'position_options': position_options,
         'correct_name': correct_player['name'],
-        'correct_position': correct_player['position']
-    })
+        'correct_position': correct_player['position'],
+        'token': tokens.question_token(
+            'toulouse',
+            {'name': correct_player['name'], 'position': correct_player['position']},
+            correct_player['image_path'],
+            token_nonce)
+    }
+
+
+@toulouse_game_bp.route('/api/question')
+def get_question():
+    """Get a random player question.
+
+    Optional query parameters: adaptive=1 to pick by rating,
+    seed + index for a reproducible question, and mode=typed to leave out
+    the name options (answer through /api/guess).
+    """
+    if len(snapshot.players) < 4:
+        return jsonify({'error': 'Not enough players loaded'}), 404
+
+    rng = seeding.request_rng('toulouse')
+    adaptive = request.args.get('adaptive', 0, type=int)
+    response = build_question(rng, adaptive=adaptive)
+
+    # The answer comes back from /api/verify (or /api/guess when typed)
+    del response['correct_name'], response['correct_position']
+    if request.args.get('mode') == 'typed':
+        del response['name_options']
+
+    return seeding.make_cacheable(jsonify(response), rng, deterministic=not adaptive)
+
+
+def build_round(n, rng=None):
+    """Deal up to n questions about n different players."""
+    players_data = snapshot.players
+    seeded = rng is not None
+    rng = rng or random
+
+    return [make_question(player, players_data, rng, seeding.nonce(rng) if seeded else None)
+            for player in rng.sample(players_data, min(n, len(players_data)))]
+
+
+@toulouse_game_bp.route('/api/round')
+def get_round():
+    """Deal a whole game (?n=10, max 50) with no player repeated.
+
+    Accepts seed + index and mode=typed like /api/question.
+    """
+    if len(snapshot.players) < 4:
+        return jsonify({'error': 'Not enough players loaded'}), 404
+
+    n = min(max(request.args.get('n', 10, type=int), 1), 50)
+    rng = seeding.request_rng('toulouse:round')
+    questions = build_round(n, rng)
+    typed = request.args.get('mode') == 'typed'
+
+    for question in questions:
+        del question['correct_name'], question['correct_position']
+        if typed:
+            del question['name_options']
+
+    return seeding.make_cacheable(jsonify({'questions': questions}), rng)
+
+
+@toulouse_game_bp.route('/api/verify', methods=['POST'])
+def verify_answer():
+    """Check a name + position answer against its question token."""
+    body, status = tokens.check_answer('toulouse', request.json)
+    if status == 200:
+        ratings.update(body['item'], body['correct'])
+        history.record_answer('toulouse', body['item'], body['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@toulouse_game_bp.route('/api/report-answer', methods=['POST'])
+def report_player_answer():
+    """Report an answer ({item: image_path, correct}) to update the player's rating."""
+    body, status = report_answer(ratings, request.json)
+    if status == 200:
+        history.record_answer('toulouse', body['item'], request.json['correct'], request.json.get('name'))
+    return jsonify(body), status
+
+
+@toulouse_game_bp.route('/api/ratings')
+def get_ratings():
+    """Get players from hardest to easiest."""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({'ratings': ratings.to_dict(limit)})
+
+
+@toulouse_game_bp.route('/api/guess', methods=['POST'])
+def guess_name():
+    """Score a typed name ({token, guess, position, score_token} or {image, guess}).
+
+    Accents, case and small typos are forgiven; the guess is right when its
+    closest squad name is the player's. With a token it is scored like
+    /api/verify (position too when sent, rating, history, score token).
+    A guess as close to two players (a shared last name) scores nothing
+    and returns the candidates, to be typed more precisely.
+    """
+    snap = snapshot
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object'}), 400
+    guess = str(data.get('guess', ''))[:100]
+
+    matches = snap.names.search(guess)
+    if len(matches) > 1:
+        return jsonify({'ambiguous': True,
+                        'candidates': sorted(snap.players[m.id]['name'] for m in matches)})
+    match = matches[0] if matches else None
+    matched = snap.players[match.id]['name'] if match else None
+    found = {'matched': matched, 'distance': match.distance if match else None}
+
+    if data.get('token'):
+        answer = {'name': matched, 'position': data.get('position')}
+        body, status = tokens.check_answer('toulouse', {**data, 'answer': answer},
+                                           only=None if data.get('position') is not None else ('name',))
+        if status == 200:
+            ratings.update(body['item'], body['correct'])
+            history.record_answer('toulouse', body['item'], body['correct'], data.get('name'))
+            body.update(found, correct_name=body['correct_answer']['name'])
+        return jsonify(body), status
+
+    # Practice guess on a photo id: nothing is scored
+    image_path = snap.photos.get(str(data.get('image')))
+    player = next((p for p in snap.players if p['image_path'] == image_path), None)
+    if player is None:
+        return jsonify({'error': 'Unknown player'}), 404
+
+    return jsonify({'correct': matched == player['name'], **found, 'correct_name': player['name']})
 
 
 @toulouse_game_bp.route('/api/stats')
+@cached('players')
 def get_stats():
     """Get game statistics."""
+    players_data = snapshot.players
     position_counts = {}
     for position in POSITIONS.values():
         count = len([p for p in players_data if p['position'] == position])
@@ -143,4 +319,5 @@ def get_stats():
 
 
 # Load players when module is imported
-load_players()
\ No newline at end of file
+load_players()
+reload.register('players', load_players, watch=[PLAYERS_FOLDER])
\ No newline at end of file